@@ -0,0 +1,94 @@
+"""
+`models.User` -> `dto.User` conversion of 1, 100 and 10k rows: DTOs validated
+from `as_dict()` against the ones built by `from_model_to_dto` without
+validation, and validated column tuples against `from_models_to_dtos`.
+No database is needed, rows are built in memory.
+
+    python -m benchmarks.converter --rows 1 100 10000
+"""
+
+import argparse
+import uuid
+from datetime import datetime
+from typing import Any, List, Tuple
+
+import src.common.dto as dto
+import src.database.models as models
+from benchmarks.common import measure_calls
+from src.database.converter import (
+    _list_adapter,
+    _validate,
+    dto_columns,
+    from_model_to_dto,
+    from_models_to_dtos,
+)
+
+# about the same total work for every size
+CONVERTED_ROWS = 100_000
+
+
+def _users(count: int) -> List[models.User]:
+    now = datetime.now()
+    return [
+        models.User(
+            id=uuid.uuid4(),
+            login=f"user-{n}",
+            password="-",
+            is_admin=False,
+            created_at=now,
+            updated_at=now,
+        )
+        for n in range(count)
+    ]
+
+
+def _run(count: int) -> None:
+    users = _users(count)
+    columns = dto_columns(models.User, dto.User)
+    rows: List[Tuple[Any, ...]] = [
+        tuple(getattr(user, column.key) for column in columns) for user in users
+    ]
+    fields = tuple(dto.User.model_fields)
+    adapter = _list_adapter(dto.User)
+    calls = max(CONVERTED_ROWS // count, 10)
+
+    def validated_tuples() -> List[Any]:
+        return adapter.validate_python(
+            [dict(zip(fields, row, strict=False)) for row in rows]
+        )
+
+    # both paths have to give the same DTOs
+    assert [_validate(user, dto.User) for user in users] == [
+        from_model_to_dto(user, dto.User) for user in users
+    ]
+    assert validated_tuples() == from_models_to_dtos(rows, dto.User)
+
+    measure_calls(
+        f"{count} entities, validated",
+        lambda _: [_validate(user, dto.User) for user in users],
+        calls,
+    )
+    measure_calls(
+        f"{count} entities, from_model_to_dto",
+        lambda _: [from_model_to_dto(user, dto.User) for user in users],
+        calls,
+    )
+    measure_calls(f"{count} tuples, validated", lambda _: validated_tuples(), calls)
+    measure_calls(
+        f"{count} tuples, from_models_to_dtos",
+        lambda _: from_models_to_dtos(rows, dto.User),
+        calls,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ORM rows to DTOs conversion")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 100, 10_000])
+    args = parser.parse_args()
+
+    for count in args.rows:
+        _run(count)
+
+
+if __name__ == "__main__":
+    main()
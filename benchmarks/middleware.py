@@ -0,0 +1,123 @@
+"""
+Per-request overhead of `ProcessMiddleware` against the `BaseHTTPMiddleware`
+class it replaced, with and without `Server-Timing`, on a FastAPI app with
+one trivial endpoint. Requests are sent straight to the ASGI app, so no
+server or HTTP client is involved.
+
+    python -m benchmarks.middleware --requests 5000
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message
+
+from benchmarks.common import measure
+from src.api.common.middlewares.process_time import ProcessMiddleware
+
+
+class BaseHTTPProcessMiddleware(BaseHTTPMiddleware):
+    """`ProcessMiddleware` as it was"""
+
+    async def dispatch(
+        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
+    ) -> Response:
+        start = time.perf_counter()
+        response = await call_next(request)
+        stop = time.perf_counter() - start
+
+        response.headers["X-Process-Time"] = f"{stop:.5f}"
+        return response
+
+
+def _app(middleware: Callable[[FastAPI], ASGIApp]) -> ASGIApp:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping() -> Dict[str, str]:
+        return {"status": "ok"}
+
+    return middleware(app)
+
+
+def _request(app: ASGIApp) -> Callable[[int], Awaitable[List[Message]]]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    async def request(_: int) -> List[Message]:
+        sent: List[Message] = []
+        received = False
+        done = asyncio.Event()
+
+        # like a server, the body comes once and the client leaves after the response
+        async def receive() -> Message:
+            nonlocal received
+            if not received:
+                received = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: Message) -> None:
+            sent.append(message)
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                done.set()
+
+        await app(dict(scope), receive, send)
+        return sent
+
+    return request
+
+
+_MIDDLEWARES: Dict[str, Callable[[Any], ASGIApp]] = {
+    "no middleware": lambda app: app,
+    "BaseHTTPMiddleware": BaseHTTPProcessMiddleware,
+    "ProcessMiddleware": ProcessMiddleware,
+    "ProcessMiddleware, Server-Timing": lambda app: ProcessMiddleware(
+        app, server_timing=True
+    ),
+}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-request middleware overhead")
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    requests = {
+        name: _request(_app(middleware)) for name, middleware in _MIDDLEWARES.items()
+    }
+    for name, request in requests.items():
+        start, *_ = await request(0)
+        assert start["status"] == 200
+        if name != "no middleware":
+            assert any(key == b"x-process-time" for key, _ in start["headers"])
+    # the first app measured would also pay for warming up the process
+    for request in requests.values():
+        for i in range(args.requests // 10):
+            await request(i)
+
+    for name, request in requests.items():
+        await measure(name, request, args.requests, unit="request")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
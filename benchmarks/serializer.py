@@ -0,0 +1,82 @@
+"""
+`dto.User` lists and pages of 1, 100 and 10k items, dumped the old way, with
+a `_default` callback per model, against `orjson_dumps` and `json_dumps`,
+which hand models and lists of one model type to a compiled serializer.
+
+    python -m benchmarks.serializer --items 1 100 10000
+"""
+
+import argparse
+import json
+import uuid
+from typing import Any, Callable, List, Tuple
+
+import orjson
+
+import src.common.dto as dto
+from benchmarks.common import measure_calls
+from src.common.serializers.default import _default
+from src.common.serializers.json import json_dumps
+from src.common.serializers.orjson import orjson_dumps
+
+# about the same total work for every size
+DUMPED_ITEMS = 100_000
+
+
+def _orjson_callback(value: Any) -> bytes:
+    return orjson.dumps(
+        value,
+        default=_default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+    )
+
+
+def _json_callback(value: Any) -> bytes:
+    return json.dumps(
+        value,
+        default=_default,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        allow_nan=False,
+    ).encode()
+
+
+_DUMPS: Tuple[Tuple[str, Callable[[Any], bytes]], ...] = (
+    ("orjson callback", _orjson_callback),
+    ("orjson_dumps", orjson_dumps),
+    ("json callback", _json_callback),
+    ("json_dumps", json_dumps),
+)
+
+
+def _dumping(dumps: Callable[[Any], bytes], value: Any) -> Callable[[int], bytes]:
+    return lambda _: dumps(value)
+
+
+def _run(count: int) -> None:
+    users: List[dto.User] = [
+        dto.User(id=uuid.uuid4(), login=f"user-{n}", is_admin=n % 2 == 0)
+        for n in range(count)
+    ]
+    page = dto.UsersPage(items=users, next_cursor="cursor")
+    calls = max(DUMPED_ITEMS // count, 10)
+
+    for name, value in ((f"{count} users", users), (f"page of {count}", page)):
+        # every path has to write the same document
+        expected = orjson.loads(_orjson_callback(value))
+        for label, dumps in _DUMPS:
+            assert orjson.loads(dumps(value)) == expected
+            measure_calls(f"{name}, {label}", _dumping(dumps, value), calls)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="DTO serialization")
+    parser.add_argument("--items", type=int, nargs="+", default=[1, 100, 10_000])
+    args = parser.parse_args()
+
+    for count in args.items:
+        _run(count)
+
+
+if __name__ == "__main__":
+    main()
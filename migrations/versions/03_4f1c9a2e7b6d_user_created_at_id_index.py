@@ -0,0 +1,36 @@
+"""user created_at id index
+
+Revision ID: 03_4f1c9a2e7b6d
+Revises: 02_675a2fb1ef50
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "03_4f1c9a2e7b6d"
+down_revision: Union[str, None] = "02_675a2fb1ef50"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # built concurrently, so writes to a large table are not blocked meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_created_at_id",
+            "user",
+            ["created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "idx_created_at_id", table_name="user", postgresql_concurrently=True
+        )
@@ -0,0 +1,29 @@
+"""user is_admin
+
+Revision ID: 04_9d2e6b1c3a7f
+Revises: 03_4f1c9a2e7b6d
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "04_9d2e6b1c3a7f"
+down_revision: Union[str, None] = "03_4f1c9a2e7b6d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user",
+        sa.Column("is_admin", sa.Boolean(), server_default=sa.false(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("user", "is_admin")
@@ -1,16 +1,18 @@
+from src.api.profiler.setup import init_app_profiler
 from src.api.setup import init_app
 from src.api.v1.setup import init_app_v1
 from src.core.settings import PROJECT_NAME, PROJECT_VERSION, load_settings
+
 # from src.core.uvicorn_server import run_api_uvicorn
 from src.core.gunicorn_server import run_api_gunicorn
 
 
 def main() -> None:
     settings = load_settings()
-    app = init_app(
-        init_app_v1(settings, title=PROJECT_NAME, version=PROJECT_VERSION),
-        settings=settings,
-    )
+    sub_apps = [init_app_v1(settings, title=PROJECT_NAME, version=PROJECT_VERSION)]
+    if settings.profiling.enabled:
+        sub_apps.append(init_app_profiler(settings, api=sub_apps[0][1]))
+    app = init_app(*sub_apps, settings=settings)
     run_api_gunicorn(app, settings)
     # run_api_uvicorn(app, settings)
 
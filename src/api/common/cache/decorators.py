@@ -0,0 +1,146 @@
+import asyncio
+import inspect
+from functools import wraps
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Concatenate,
+    Coroutine,
+    Dict,
+    Final,
+    ParamSpec,
+    Protocol,
+    Sequence,
+    Set,
+    Type,
+    TypeVar,
+)
+
+from src.api.common.cache.redis import ONE_MINUTE, RedisCache
+from src.common.dto.base import DTOType
+from src.core.logger import log
+
+TAG_PREFIX: Final[str] = "tag"
+
+P = ParamSpec("P")
+
+
+class _WithCache(Protocol):
+    _cache: RedisCache
+
+
+S = TypeVar("S", bound=_WithCache)
+
+_background: Set["asyncio.Task[Any]"] = set()
+
+
+def _tag_key(tag: str) -> str:
+    return f"{TAG_PREFIX}:{tag}"
+
+
+async def invalidate_tags(cache: RedisCache, *tags: str) -> int:
+    """Drops every cached entry which was stored with any of `tags`"""
+    if not tags:
+        return 0
+    # goes through `delete`, so a tiered cache also drops its local copies
+    tag_keys = [_tag_key(tag) for tag in tags]
+    keys = await cache.get_members(*tag_keys)
+    await cache.delete(*keys, *tag_keys)
+
+    return len(keys)
+
+
+def _on_done(task: "asyncio.Task[Any]") -> None:
+    _background.discard(task)
+    if not task.cancelled() and (err := task.exception()):
+        log.error(f"Cache revalidation failed -> {err!r}")
+
+
+def cached(
+    key: str,
+    dto: Type[DTOType],
+    ttl: int = ONE_MINUTE,
+    stale_ttl: int = 0,
+    tags: Sequence[str] = (),
+) -> Callable[
+    [Callable[Concatenate[S, P], Awaitable[DTOType]]],
+    Callable[Concatenate[S, P], Coroutine[Any, Any, DTOType]],
+]:
+    """
+    Read-through cache for methods which return a DTO.
+
+    The instance must keep `RedisCache` in the `_cache` attribute.
+    Methods taking `**kwargs` need a positional-only `self`, so it can't
+    collide with a keyword argument.
+    `key` and `tags` are format strings over the method arguments,
+    e.g. `key="user:{query.user_id}"`.
+
+    Concurrent misses of the same key within a worker share one call.
+    With `stale_ttl` an entry older than `ttl` is still returned
+    for `stale_ttl` seconds while being refreshed in the background.
+    Either way the method runs outside of the request which called it,
+    so it must open its own session, e.g. from a gateway factory,
+    instead of using a request scoped one.
+    """
+
+    def _wrapper(
+        coro: Callable[Concatenate[S, P], Awaitable[DTOType]],
+    ) -> Callable[Concatenate[S, P], Coroutine[Any, Any, DTOType]]:
+        signature = inspect.signature(coro)
+        inflight: Dict[str, "asyncio.Task[DTOType]"] = {}
+
+        async def _load(
+            cache: RedisCache,
+            cache_key: str,
+            cache_tags: Sequence[str],
+            load: Callable[[], Awaitable[DTOType]],
+        ) -> DTOType:
+            result = await load()
+            await cache.set_with_tags(
+                cache_key,
+                result.model_dump_json(),
+                [_tag_key(tag) for tag in cache_tags],
+                expire_seconds=ttl + stale_ttl,
+            )
+
+            return result
+
+        def _single_flight(
+            cache: RedisCache,
+            cache_key: str,
+            cache_tags: Sequence[str],
+            load: Callable[[], Awaitable[DTOType]],
+        ) -> "asyncio.Task[DTOType]":
+            task = inflight.get(cache_key)
+            if task is None:
+                task = asyncio.create_task(_load(cache, cache_key, cache_tags, load))
+                inflight[cache_key] = task
+                task.add_done_callback(lambda _: inflight.pop(cache_key, None))
+            return task
+
+        @wraps(coro)
+        async def _inner(self: S, /, *args: P.args, **kwargs: P.kwargs) -> DTOType:
+            params = signature.bind(self, *args, **kwargs).arguments
+            cache = self._cache
+            cache_key = key.format(**params)
+            cache_tags = [tag.format(**params) for tag in tags]
+
+            def load() -> Awaitable[DTOType]:
+                return coro(self, *args, **kwargs)
+
+            raw, remaining = await cache.get_with_ttl(cache_key)
+            if raw is not None:
+                if stale_ttl and remaining < stale_ttl * 1000:
+                    task = _single_flight(cache, cache_key, cache_tags, load)
+                    _background.add(task)
+                    task.add_done_callback(_on_done)
+                return dto.model_validate_json(raw)
+
+            return await asyncio.shield(
+                _single_flight(cache, cache_key, cache_tags, load)
+            )
+
+        return _inner
+
+    return _wrapper
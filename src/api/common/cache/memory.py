@@ -0,0 +1,127 @@
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+KT = TypeVar("KT", bound=Hashable)
+VT = TypeVar("VT")
+
+
+@dataclass(frozen=True, slots=True)
+class CacheStats:
+    hits: int
+    misses: int
+    size: int
+    max_size: int
+    bytes: int = 0
+    max_bytes: Optional[int] = None
+
+
+class MemoryCache(Generic[KT, VT]):
+    """
+    Bounded per-process LRU cache with per-entry TTL.
+
+    Nothing is shared between workers, so entries must be safe to
+    serve for `ttl_seconds` after they were changed elsewhere.
+    With `max_bytes` the total `sizeof` of values is capped as well.
+    """
+
+    __slots__ = (
+        "_data",
+        "_max_size",
+        "_max_bytes",
+        "_sizeof",
+        "_bytes",
+        "_ttl",
+        "_hits",
+        "_misses",
+    )
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl_seconds: float = 60.0,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[VT], int] = sys.getsizeof,
+    ) -> None:
+        self._data: OrderedDict[KT, Tuple[float, VT, int]] = OrderedDict()
+        self._max_size = max_size
+        self._max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._bytes = 0
+        self._ttl = ttl_seconds
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @property
+    def ttl_seconds(self) -> float:
+        return self._ttl
+
+    def get(self, key: KT) -> Optional[VT]:
+        entry = self._data.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        expire, value, _ = entry
+        if expire <= time.monotonic():
+            self.pop(key)
+            self._misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self._hits += 1
+
+        return value
+
+    def set(self, key: KT, value: VT, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self._ttl if ttl_seconds is None else ttl_seconds
+        if ttl <= 0:
+            return
+
+        size = self._sizeof(value) if self._max_bytes else 0
+        if self._max_bytes and size > self._max_bytes:
+            return
+
+        self.pop(key)
+        self._data[key] = (time.monotonic() + ttl, value, size)
+        self._bytes += size
+        while len(self._data) > self._max_size or (
+            self._max_bytes and self._bytes > self._max_bytes
+        ):
+            _, (_, _, evicted) = self._data.popitem(last=False)
+            self._bytes -= evicted
+
+    def pop(self, key: KT) -> Optional[VT]:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return None
+
+        self._bytes -= entry[2]
+        return entry[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._bytes = 0
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            size=len(self._data),
+            max_size=self._max_size,
+            bytes=self._bytes,
+            max_bytes=self._max_bytes,
+        )
+
+    def __contains__(self, key: KT) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._data)
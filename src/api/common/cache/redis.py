@@ -1,21 +1,104 @@
+import time
+from contextlib import asynccontextmanager
+from functools import wraps
 from typing import (
+    TYPE_CHECKING,
     Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
     Final,
     List,
     Literal,
+    Mapping,
     Optional,
+    ParamSpec,
+    Protocol,
+    Sequence,
+    Set,
+    Tuple,
     TypeVar,
     Union,
+    cast,
+    runtime_checkable,
 )
 
 import orjson
 import redis.asyncio as aioredis
+from redis.asyncio.client import Pipeline, PubSub
+from redis.asyncio.cluster import ClusterNode, RedisCluster
+from redis.asyncio.connection import AbstractConnection
+from redis.asyncio.sentinel import Sentinel
+from redis.commands.core import AsyncScript
 
 from src.common.dto.base import DTO
+from src.common.metrics import (
+    REDIS_COMMAND_SECONDS,
+    REDIS_POOL_IN_USE,
+    REDIS_POOL_WAIT_SECONDS,
+)
 from src.common.serializers.orjson import orjson_dumps
+from src.common.timing import timed
 from src.core.settings import RedisSettings
 
 ValueType = TypeVar("ValueType", float, int, str, bytes, bool)
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+class RedisClient(Protocol):
+    """
+    Commands used by the caches. Standalone, sentinel and cluster clients
+    all have them, though stubs of the cluster one don't declare its commands yet
+    """
+
+    async def get(self, name: str) -> Optional[bytes]: ...
+
+    async def set(
+        self,
+        name: str,
+        value: Any,
+        ex: Optional[int] = None,
+        px: Optional[int] = None,
+        nx: bool = False,
+        xx: bool = False,
+        keepttl: bool = False,
+        get: bool = False,
+    ) -> Optional[bool]: ...
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]: ...
+
+    async def mset(self, mapping: Mapping[Any, Any]) -> bool: ...
+
+    async def delete(self, *names: str) -> int: ...
+
+    async def lrange(self, name: str, start: int, end: int) -> List[bytes]: ...
+
+    async def lrem(self, name: str, count: int, value: str) -> int: ...
+
+    def pipeline(
+        self, transaction: bool = True, shard_hint: Optional[str] = None
+    ) -> "Pipeline[Any]": ...
+
+    def register_script(self, script: str) -> AsyncScript: ...
+
+
+@runtime_checkable
+class PubSubClient(RedisClient, Protocol):
+    """Cluster client can't do pub/sub, standalone and sentinel ones can"""
+
+    async def publish(self, channel: str, message: bytes) -> int: ...
+
+    def pubsub(self, **kwargs: Any) -> PubSub: ...
+
+
+@runtime_checkable
+class ClusterClient(RedisClient, Protocol):
+    """Cluster has no cross slot MGET/MSET, these split keys by slot instead"""
+
+    async def mget_nonatomic(self, keys: List[str]) -> List[Optional[bytes]]: ...
+
+    async def mset_nonatomic(self, mapping: Mapping[Any, Any]) -> bool: ...
 
 
 class NonSerializableObjectsProvidedError(Exception):
@@ -32,16 +115,88 @@ def _str_key(key: Any) -> str:
     return str(key)
 
 
+def _decode(value: Union[str, bytes]) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _serialize(value: Any) -> Any:
+    if isinstance(value, (DTO, dict, list)):
+        try:
+            return orjson_dumps(value)
+        except orjson.JSONEncodeError as e:
+            raise NonSerializableObjectsProvidedError(
+                "Some of object that you provided is not serializable"
+            ) from e
+
+    return value
+
+
+def redis_command(
+    name: Optional[str] = None,
+) -> Callable[[Callable[P, Awaitable[R]]], Callable[P, Awaitable[R]]]:
+    """Records the call as the `redis` phase and into the latency histogram"""
+
+    def _wrapper(coro: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+        observe = REDIS_COMMAND_SECONDS.labels(name or coro.__name__).observe
+
+        @wraps(coro)
+        async def _inner(*args: P.args, **kwargs: P.kwargs) -> R:
+            start = time.perf_counter()
+            with timed("redis"):
+                try:
+                    return await coro(*args, **kwargs)
+                finally:
+                    observe(time.perf_counter() - start)
+
+        return _inner
+
+    return _wrapper
+
+
+if TYPE_CHECKING:
+    _BlockingConnectionPool = aioredis.BlockingConnectionPool[aioredis.Connection]
+else:
+    _BlockingConnectionPool = aioredis.BlockingConnectionPool
+
+
+class TimedConnectionPool(_BlockingConnectionPool):
+    """Blocking pool which also measures how long it takes to get a connection"""
+
+    async def get_connection(
+        self, command_name: Any, *keys: Any, **options: Any
+    ) -> aioredis.Connection:
+        start = time.perf_counter()
+        try:
+            connection = await super().get_connection(command_name, *keys, **options)
+        finally:
+            REDIS_POOL_WAIT_SECONDS.observe(time.perf_counter() - start)
+        REDIS_POOL_IN_USE.inc()
+
+        return connection
+
+    async def release(self, connection: AbstractConnection) -> None:
+        await super().release(connection)
+        REDIS_POOL_IN_USE.dec()
+
+
 class RedisCache:
-    __slots__ = ("_redis",)
+    """
+    Values are returned as raw bytes, so serialized payloads are handed
+    over as is, e.g. straight into `model_validate_json`.
+    """
 
-    # why mypy thinks that Redis is Generic if it isn't. Wtf
-    def __init__(self, redis: aioredis.Redis) -> None:  # type: ignore
+    __slots__ = ("_redis", "_cluster")
+
+    def __init__(self, redis: RedisClient) -> None:
         self._redis = redis
+        # cluster has neither transactions nor cross slot MGET/MSET
+        self._cluster = redis if isinstance(redis, ClusterClient) else None
 
-    async def get_single(self, key: Any) -> Optional[str]:
+    @redis_command()
+    async def get_single(self, key: Any) -> Optional[bytes]:
         return await self._redis.get(_str_key(key))
 
+    @redis_command()
     async def set_single(
         self,
         key: Union[str, Any],
@@ -51,18 +206,9 @@ class RedisCache:
         return_origin: bool = True,
         **additional: Any,
     ) -> Optional[Union[ValueType, bool]]:
-        serialized = None
-        if isinstance(value, (DTO, dict, list)):
-            try:
-                serialized = orjson_dumps(value)
-            except orjson.JSONDecodeError as e:
-                raise NonSerializableObjectsProvidedError(
-                    "Some of object that you provided is not serializable"
-                ) from e
-
         set_value = await self._redis.set(
             _str_key(key),
-            serialized or value,
+            _serialize(value),
             ex=expire_seconds,
             px=expire_milliseconds,
             **additional,
@@ -72,10 +218,97 @@ class RedisCache:
 
         return set_value
 
+    @redis_command()
+    async def get_with_ttl(self, key: Any) -> Tuple[Optional[bytes], int]:
+        """Returns value and its remaining ttl in milliseconds in one round trip"""
+        async with self._redis.pipeline(transaction=False) as pipe:
+            value, ttl = await pipe.get(_str_key(key)).pttl(_str_key(key)).execute()
+
+        return value, int(ttl)
+
+    @redis_command()
+    async def get_many(self, *keys: Any) -> List[Optional[bytes]]:
+        if not keys:
+            return []
+        str_keys = [_str_key(key) for key in keys]
+        if self._cluster is not None:
+            return await self._cluster.mget_nonatomic(str_keys)
+        return await self._redis.mget(str_keys)
+
+    @redis_command()
+    async def set_many(
+        self,
+        values: Mapping[Any, Any],
+        expire_seconds: Optional[int] = ONE_HOUR,
+        expire_milliseconds: Optional[int] = None,
+        transaction: bool = False,
+    ) -> None:
+        if not values:
+            return
+
+        mapping = {_str_key(key): _serialize(value) for key, value in values.items()}
+        if not (expire_seconds or expire_milliseconds):
+            if self._cluster is not None:
+                await self._cluster.mset_nonatomic(mapping)
+            else:
+                await self._redis.mset(mapping)
+            return
+
+        # MSET can't set a ttl, so each key gets its own SET in one round trip
+        async with self.pipeline(transaction=transaction) as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=expire_seconds, px=expire_milliseconds)
+
+    @redis_command()
+    async def set_with_tags(
+        self,
+        key: Any,
+        value: Any,
+        tags: Sequence[Any],
+        expire_seconds: int = ONE_HOUR,
+    ) -> None:
+        """Sets the value and adds its key into every tag set in one round trip"""
+        key = _str_key(key)
+        async with self.pipeline(transaction=False) as pipe:
+            pipe.set(key, _serialize(value), ex=expire_seconds)
+            # the latest entry always lives the longest, so the tag follows it
+            for tag in tags:
+                pipe.sadd(_str_key(tag), key)
+                pipe.expire(_str_key(tag), expire_seconds)
+
+    @redis_command()
+    async def get_members(self, *keys: Any) -> Set[str]:
+        if not keys:
+            return set()
+        async with self.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.smembers(_str_key(key))
+            members = await pipe.execute()
+
+        return {_decode(member) for chunk in members for member in chunk}
+
+    @asynccontextmanager
+    async def pipeline(
+        self, transaction: bool = True
+    ) -> AsyncIterator["Pipeline[Any]"]:
+        """
+        Commands queued inside of the block are sent in one round trip on exit,
+        with `transaction=True` they are also wrapped into MULTI/EXEC
+        (ignored on a cluster, which doesn't support it).
+        Call `await pipe.execute()` inside of the block if results are needed
+        """
+        transaction = transaction and self._cluster is None
+        with timed("redis"):
+            async with self._redis.pipeline(transaction=transaction) as pipe:
+                yield pipe
+                await pipe.execute()
+
+    @redis_command()
     async def delete(self, *keys: Any) -> None:
         r_keys = (_str_key(key) for key in keys)
         await self._redis.delete(*r_keys)
 
+    @redis_command()
     async def set_list(
         self,
         key: Any,
@@ -86,31 +319,88 @@ class RedisCache:
     ) -> int:
         key = _str_key(key)
 
-        push = self._redis.lpush if side == "left" else self._redis.rpush
+        async with self.pipeline(transaction=True) as pipe:
+            push = pipe.lpush if side == "left" else pipe.rpush
+            push(key, *values)
+            if expire_seconds:
+                pipe.expire(key, expire_seconds)
+            if expire_milliseconds:
+                pipe.pexpire(key, expire_milliseconds)
 
-        result = await push(key, *values)
+            result, *_ = await pipe.execute()
 
-        if expire_seconds:
-            await self._redis.expire(key, expire_seconds)
-        if expire_milliseconds:
-            await self._redis.pexpire(key, expire_milliseconds)
-
-        return result
+        return int(result)
 
+    @redis_command()
     async def get_list(self, key: Any, start: int = 0, end: int = -1) -> List[str]:
-        return await self._redis.lrange(_str_key(key), start, end)
+        values = await self._redis.lrange(_str_key(key), start, end)
+        return [_decode(value) for value in values]
 
+    @redis_command()
     async def pop(self, key: Any, value: str, count: int = 0) -> int:
         return await self._redis.lrem(_str_key(key), count, value)
 
+    def register_script(self, script: str) -> AsyncScript:
+        return self._redis.register_script(script)
 
-def get_redis(settings: RedisSettings, **kw: Any) -> RedisCache:
-    return RedisCache(
-        aioredis.Redis(
-            host=settings.host,
-            port=settings.port,
-            password=settings.password,
-            decode_responses=True,
-            **kw
+
+def redis_nodes(settings: RedisSettings) -> List[Tuple[str, int]]:
+    if not settings.nodes:
+        return [(settings.host, settings.port)]
+
+    nodes = []
+    for node in settings.nodes:
+        host, _, port = node.rpartition(":")
+        nodes.append((host, int(port)) if host else (node, settings.port))
+
+    return nodes
+
+
+def create_redis_client(
+    settings: RedisSettings, decode_responses: bool = False, **kw: Any
+) -> RedisClient:
+    options = {
+        "password": settings.password,
+        "socket_timeout": settings.socket_timeout,
+        "socket_connect_timeout": settings.socket_connect_timeout,
+        "health_check_interval": settings.health_check_interval,
+        "protocol": settings.protocol,
+        "decode_responses": decode_responses,
+    } | kw
+
+    if settings.mode == "cluster":
+        # max_connections is applied per node here
+        cluster: RedisCluster[Any] = RedisCluster(
+            startup_nodes=[
+                ClusterNode(host, port) for host, port in redis_nodes(settings)
+            ],
+            max_connections=settings.max_connections,
+            **options,
+        )
+        return cast(ClusterClient, cluster)
+    if settings.mode == "sentinel":
+        sentinel = Sentinel(
+            redis_nodes(settings),
+            sentinel_kwargs={
+                "password": settings.sentinel_password,
+                "socket_timeout": settings.socket_timeout,
+            },
+            **options,
+        )
+        return sentinel.master_for(
+            settings.sentinel_master, max_connections=settings.max_connections
         )
+
+    pool = TimedConnectionPool(
+        max_connections=settings.max_connections,
+        # stubs say int, the pool hands it to asyncio.timeout which takes floats
+        timeout=settings.pool_timeout,  # type: ignore[arg-type]
+        host=settings.host,
+        port=settings.port,
+        **options,
     )
+    return aioredis.Redis(connection_pool=pool)
+
+
+def get_redis(settings: RedisSettings, **kw: Any) -> RedisCache:
+    return RedisCache(create_redis_client(settings, **kw))
@@ -0,0 +1,158 @@
+import hashlib
+import time
+import uuid
+from datetime import datetime
+from typing import Final, Tuple
+
+from src.api.common.cache.redis import RedisCache, redis_command
+
+DEFAULT_TOKENS_COUNT: Final[int] = 5
+
+# KEYS[1] - hash `fingerprint -> token digest`
+# KEYS[2] - sorted set `fingerprint -> expire at (ms)`
+# every script drops expired sessions first and keeps both keys alive
+# until the latest session expires
+_PURGE: Final[str] = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+if #expired > 0 then
+    redis.call('HDEL', KEYS[1], unpack(expired))
+    redis.call('ZREM', KEYS[2], unpack(expired))
+end
+"""
+_STORE: Final[str] = """
+local function store(fingerprint, digest, expire_at, limit)
+    redis.call('HSET', KEYS[1], fingerprint, digest)
+    redis.call('ZADD', KEYS[2], expire_at, fingerprint)
+    local overflow = redis.call('ZCARD', KEYS[2]) - limit
+    if overflow > 0 then
+        local oldest = redis.call('ZRANGE', KEYS[2], 0, overflow - 1)
+        redis.call('HDEL', KEYS[1], unpack(oldest))
+        redis.call('ZREM', KEYS[2], unpack(oldest))
+    end
+    local last = redis.call('ZRANGE', KEYS[2], -1, -1, 'WITHSCORES')
+    redis.call('PEXPIREAT', KEYS[1], last[2])
+    redis.call('PEXPIREAT', KEYS[2], last[2])
+end
+"""
+# ARGV: now, fingerprint, digest, expire_at, limit
+ADD_SCRIPT: Final[str] = (
+    _PURGE
+    + _STORE
+    + """
+store(ARGV[2], ARGV[3], ARGV[4], tonumber(ARGV[5]))
+return 1
+"""
+)
+# ARGV: now, fingerprint, old digest, new digest, expire_at, limit
+ROTATE_SCRIPT: Final[str] = (
+    _PURGE
+    + _STORE
+    + """
+if redis.call('HGET', KEYS[1], ARGV[2]) ~= ARGV[3] then
+    redis.call('DEL', KEYS[1], KEYS[2])
+    return 0
+end
+store(ARGV[2], ARGV[4], ARGV[5], tonumber(ARGV[6]))
+return 1
+"""
+)
+# ARGV: now, digest
+REVOKE_SCRIPT: Final[str] = (
+    _PURGE
+    + """
+local sessions = redis.call('HGETALL', KEYS[1])
+for i = 1, #sessions, 2 do
+    if sessions[i + 1] == ARGV[2] then
+        redis.call('HDEL', KEYS[1], sessions[i])
+        redis.call('ZREM', KEYS[2], sessions[i])
+        return 1
+    end
+end
+return 0
+"""
+)
+
+
+def _digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _keys(user_id: uuid.UUID) -> Tuple[str, str]:
+    # same hash tag for both keys, so scripts still work on a cluster
+    key = f"refresh:{{{user_id}}}"
+    return key, f"{key}:exp"
+
+
+class RefreshSessionStore:
+    """
+    Refresh sessions of a user, one per fingerprint.
+
+    Only token digests are stored. Each operation is a single
+    Lua script call, so concurrent refreshes can't race each other.
+    """
+
+    __slots__ = ("_max_sessions", "_add", "_rotate", "_revoke", "_cache")
+
+    def __init__(
+        self, cache: RedisCache, max_sessions: int = DEFAULT_TOKENS_COUNT
+    ) -> None:
+        self._cache = cache
+        self._max_sessions = max_sessions
+        self._add = cache.register_script(ADD_SCRIPT)
+        self._rotate = cache.register_script(ROTATE_SCRIPT)
+        self._revoke = cache.register_script(REVOKE_SCRIPT)
+
+    @redis_command("session_add")
+    async def add(
+        self, user_id: uuid.UUID, fingerprint: str, token: str, expire: datetime
+    ) -> None:
+        await self._add(
+            keys=_keys(user_id),
+            args=(
+                _now_ms(),
+                fingerprint,
+                _digest(token),
+                int(expire.timestamp() * 1000),
+                self._max_sessions,
+            ),
+        )
+
+    @redis_command("session_rotate")
+    async def rotate(
+        self,
+        user_id: uuid.UUID,
+        fingerprint: str,
+        old_token: str,
+        new_token: str,
+        expire: datetime,
+    ) -> bool:
+        """
+        Replaces `old_token` with `new_token` for the fingerprint.
+        On mismatch every session of the user is revoked and False is returned
+        """
+        result = await self._rotate(
+            keys=_keys(user_id),
+            args=(
+                _now_ms(),
+                fingerprint,
+                _digest(old_token),
+                _digest(new_token),
+                int(expire.timestamp() * 1000),
+                self._max_sessions,
+            ),
+        )
+        return bool(result)
+
+    @redis_command("session_revoke")
+    async def revoke(self, user_id: uuid.UUID, token: str) -> bool:
+        result = await self._revoke(
+            keys=_keys(user_id), args=(_now_ms(), _digest(token))
+        )
+        return bool(result)
+
+    async def revoke_all(self, user_id: uuid.UUID) -> None:
+        await self._cache.delete(*_keys(user_id))
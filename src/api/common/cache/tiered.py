@@ -0,0 +1,341 @@
+import asyncio
+import sys
+import time
+import uuid
+from typing import (
+    Any,
+    Callable,
+    Final,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import orjson
+from redis.exceptions import RedisError
+
+from src.api.common.cache.memory import CacheStats, MemoryCache
+from src.api.common.cache.redis import (
+    ONE_HOUR,
+    PubSubClient,
+    RedisCache,
+    RedisClient,
+    ValueType,
+    _str_key,
+    create_redis_client,
+    redis_nodes,
+)
+from src.core.logger import log
+from src.core.settings import CacheSettings, RedisSettings
+
+INVALIDATION_CHANNEL: Final[str] = "cache:invalidate"
+RECONNECT_DELAY_SECONDS: Final[float] = 1.0
+
+# value and its expiration in redis by the monotonic clock, None if it never expires
+LocalEntry = Tuple[bytes, Optional[float]]
+# keys changed by another worker, None if anything could have changed
+Subscriber = Callable[[Optional[Sequence[str]]], None]
+
+
+def _sizeof(entry: LocalEntry) -> int:
+    return sys.getsizeof(entry[0])
+
+
+class InvalidationChannel:
+    """
+    Pub/sub channel workers announce changed keys over, so their per-worker
+    copies can be dropped everywhere. Subscribers are called with keys changed
+    by other workers, or with None when messages could have been missed.
+    While it is not `connected` nothing kept in memory should be served
+    """
+
+    __slots__ = (
+        "_pubsub",
+        "_channel",
+        "_origin",
+        "_listener",
+        "_subscribers",
+        "connected",
+    )
+
+    def __init__(
+        self, pubsub: RedisClient, channel: str = INVALIDATION_CHANNEL
+    ) -> None:
+        # cluster client can't do pub/sub, but any single node can
+        if not isinstance(pubsub, PubSubClient):
+            raise TypeError("Cluster client needs a single node client for pub/sub")
+        self._pubsub = pubsub
+        self._channel = channel
+        self._origin = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task[None]] = None
+        self._subscribers: List[Subscriber] = []
+        self.connected = False
+
+    def subscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.append(subscriber)
+
+    async def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+        self.connected = False
+        self._notify(None)
+
+    async def publish(self, keys: Sequence[str]) -> None:
+        await self._pubsub.publish(
+            self._channel, orjson.dumps({"origin": self._origin, "keys": keys})
+        )
+
+    def _notify(self, keys: Optional[Sequence[str]]) -> None:
+        for subscriber in self._subscribers:
+            subscriber(keys)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self._pubsub.pubsub(
+                    ignore_subscribe_messages=True
+                ) as pubsub:
+                    await pubsub.subscribe(self._channel)
+                    # anything could change while we were not listening
+                    self._notify(None)
+                    self.connected = True
+                    async for message in pubsub.listen():
+                        data = orjson.loads(message["data"])
+                        if data.get("origin") != self._origin:
+                            self._notify(data.get("keys", ()))
+            except (RedisError, OSError, orjson.JSONDecodeError) as e:
+                log.warning(f"Cache invalidation listener failed -> {e!r}")
+            finally:
+                self.connected = False
+
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+
+class TieredCache(RedisCache):
+    """
+    RedisCache with a per-worker memory layer in front of it.
+
+    Only plain values read through `get_single`, `get_with_ttl` and `get_many`
+    are kept locally. Every write through this class is announced over
+    the `invalidation` channel, so other workers drop their local copies.
+    While the subscription is down the local layer is bypassed, so a missed
+    message can't leave a stale entry behind.
+    """
+
+    __slots__ = ("_local", "_generation", "invalidation")
+
+    def __init__(
+        self,
+        redis: RedisClient,
+        max_size: int = 10_000,
+        max_bytes: Optional[int] = 64 * 1024 * 1024,
+        ttl_seconds: float = 5.0,
+        channel: str = INVALIDATION_CHANNEL,
+        pubsub: Optional[RedisClient] = None,
+    ) -> None:
+        super().__init__(redis)
+        self.invalidation = InvalidationChannel(pubsub or redis, channel)
+        self.invalidation.subscribe(self._on_invalidate)
+        self._local: MemoryCache[str, LocalEntry] = MemoryCache(
+            max_size, ttl_seconds, max_bytes=max_bytes, sizeof=_sizeof
+        )
+        # bumped on every invalidation, reads started before it are not stored
+        self._generation = 0
+
+    async def start(self) -> None:
+        await self.invalidation.start()
+
+    async def stop(self) -> None:
+        await self.invalidation.stop()
+
+    def stats(self) -> CacheStats:
+        return self._local.stats()
+
+    async def get_single(self, key: Any) -> Optional[bytes]:
+        value, _ = await self.get_with_ttl(key)
+        return value
+
+    async def get_with_ttl(self, key: Any) -> Tuple[Optional[bytes], int]:
+        key = _str_key(key)
+        if self.invalidation.connected and (entry := self._local.get(key)):
+            return _with_ttl(entry)
+
+        generation = self._generation
+        value, ttl = await super().get_with_ttl(key)
+        self._remember(key, value, ttl, generation)
+
+        return value, ttl
+
+    async def get_many(self, *keys: Any) -> List[Optional[bytes]]:
+        str_keys = [_str_key(key) for key in keys]
+        result: List[Optional[bytes]] = [None] * len(str_keys)
+        missed: List[int] = []
+        for i, key in enumerate(str_keys):
+            if self.invalidation.connected and (entry := self._local.get(key)):
+                result[i] = entry[0]
+            else:
+                missed.append(i)
+
+        if not missed:
+            return result
+
+        generation = self._generation
+        async with self.pipeline(transaction=False) as pipe:
+            for i in missed:
+                pipe.get(str_keys[i]).pttl(str_keys[i])
+            fetched = await pipe.execute()
+
+        for n, i in enumerate(missed):
+            value, ttl = fetched[n * 2], fetched[n * 2 + 1]
+            self._remember(str_keys[i], value, int(ttl), generation)
+            result[i] = value
+
+        return result
+
+    async def set_single(
+        self,
+        key: Any,
+        value: ValueType,
+        expire_seconds: Optional[int] = ONE_HOUR,
+        expire_milliseconds: Optional[int] = None,
+        return_origin: bool = True,
+        **additional: Any,
+    ) -> Any:
+        result = await super().set_single(
+            key,
+            value,
+            expire_seconds=expire_seconds,
+            expire_milliseconds=expire_milliseconds,
+            return_origin=return_origin,
+            **additional,
+        )
+        await self._invalidate(key)
+
+        return result
+
+    async def set_many(
+        self,
+        values: Mapping[Any, Any],
+        expire_seconds: Optional[int] = ONE_HOUR,
+        expire_milliseconds: Optional[int] = None,
+        transaction: bool = False,
+    ) -> None:
+        await super().set_many(
+            values,
+            expire_seconds=expire_seconds,
+            expire_milliseconds=expire_milliseconds,
+            transaction=transaction,
+        )
+        await self._invalidate(*values)
+
+    async def set_with_tags(
+        self,
+        key: Any,
+        value: Any,
+        tags: Sequence[Any],
+        expire_seconds: int = ONE_HOUR,
+    ) -> None:
+        await super().set_with_tags(key, value, tags, expire_seconds=expire_seconds)
+        await self._invalidate(key)
+
+    async def delete(self, *keys: Any) -> None:
+        await super().delete(*keys)
+        await self._invalidate(*keys)
+
+    def _remember(
+        self, key: str, value: Optional[bytes], ttl_ms: int, generation: int
+    ) -> None:
+        if (
+            value is None
+            or not self.invalidation.connected
+            or generation != self._generation
+        ):
+            return
+
+        ttl = self._local.ttl_seconds
+        expire_at = None
+        # -1 means that the key has no expiration in redis
+        if ttl_ms >= 0:
+            ttl = min(ttl, ttl_ms / 1000)
+            expire_at = time.monotonic() + ttl_ms / 1000
+
+        self._local.set(key, (value, expire_at), ttl)
+
+    def _forget(self, keys: Iterable[str]) -> None:
+        self._generation += 1
+        for key in keys:
+            self._local.pop(key)
+
+    def _on_invalidate(self, keys: Optional[Sequence[str]]) -> None:
+        if keys is None:
+            self._generation += 1
+            self._local.clear()
+        else:
+            self._forget(keys)
+
+    async def _invalidate(self, *keys: Any) -> None:
+        if not keys:
+            return
+
+        str_keys = [_str_key(key) for key in keys]
+        self._forget(str_keys)
+        await self.invalidation.publish(str_keys)
+
+
+def _with_ttl(entry: LocalEntry) -> Tuple[bytes, int]:
+    value, expire_at = entry
+    if expire_at is None:
+        return value, -1
+
+    return value, max(int((expire_at - time.monotonic()) * 1000), 0)
+
+
+def _pubsub_client(settings: RedisSettings) -> Optional[RedisClient]:
+    """Single node client for pub/sub of a cluster, None if the client can do it"""
+    if settings.mode != "cluster":
+        return None
+
+    host, port = redis_nodes(settings)[0]
+    # one connection for the listener and one for publishing
+    single = {
+        "mode": "standalone",
+        "host": host,
+        "port": port,
+        "max_connections": 2,
+    }
+    return create_redis_client(settings.model_copy(update=single))
+
+
+def get_tiered_redis(
+    settings: RedisSettings, cache: CacheSettings, **kw: Any
+) -> TieredCache:
+    return TieredCache(
+        create_redis_client(settings, **kw),
+        max_size=cache.local_max_size,
+        max_bytes=cache.local_max_bytes,
+        ttl_seconds=cache.local_ttl_seconds,
+        pubsub=_pubsub_client(settings),
+    )
+
+
+def get_invalidation_channel(
+    settings: RedisSettings, cache: RedisCache
+) -> InvalidationChannel:
+    """Channel of a tiered `cache`, or a new one on the client of a plain one"""
+    if isinstance(cache, TieredCache):
+        return cache.invalidation
+
+    return InvalidationChannel(_pubsub_client(settings) or cache._redis)
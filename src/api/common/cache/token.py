@@ -0,0 +1,135 @@
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, DefaultDict, Dict, Final, NamedTuple, Optional, Sequence, Set
+
+from src.api.common.cache.memory import CacheStats, MemoryCache
+from src.api.common.cache.tiered import InvalidationChannel
+from src.common.dto import User
+from src.common.metrics import TOKEN_CACHE_ENTRIES, TOKEN_CACHE_LOOKUPS, CounterChild
+
+_HIT: Final[CounterChild] = TOKEN_CACHE_LOOKUPS.labels("hit")
+_MISS: Final[CounterChild] = TOKEN_CACHE_LOOKUPS.labels("miss")
+# announced over the invalidation channel when tokens of a user are dropped
+USER_KEY_PREFIX: Final[str] = "token-user:"
+
+
+class VerifiedToken(NamedTuple):
+    payload: Dict[str, Any]
+    user: User
+
+
+class TokenCache:
+    """
+    Per-worker cache of already verified tokens.
+
+    An entry never outlives the `exp` claim of its token. All entries of a user
+    are dropped with `invalidate_user`, in every worker when the cache has
+    an `invalidation` channel. While the channel is down nothing is served.
+    """
+
+    __slots__ = ("_cache", "_users", "_invalidation", "_generation")
+
+    def __init__(
+        self,
+        max_size: int = 10_000,
+        ttl_seconds: float = 60.0,
+        invalidation: Optional[InvalidationChannel] = None,
+    ) -> None:
+        self._cache: MemoryCache[str, VerifiedToken] = MemoryCache(
+            max_size, ttl_seconds
+        )
+        self._users: DefaultDict[uuid.UUID, Set[str]] = defaultdict(set)
+        self._invalidation = invalidation
+        if invalidation is not None:
+            invalidation.subscribe(self._on_invalidate)
+        # bumped on every invalidation, users loaded before it are not stored
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        """Taken before loading a user and handed to `set`"""
+        return self._generation
+
+    def get(self, token: str) -> Optional[VerifiedToken]:
+        if self._invalidation is not None and not self._invalidation.connected:
+            _MISS.inc()
+            return None
+
+        entry = self._cache.get(token)
+        (_HIT if entry is not None else _MISS).inc()
+
+        return entry
+
+    def set(
+        self,
+        token: str,
+        payload: Dict[str, Any],
+        user: User,
+        generation: Optional[int] = None,
+    ) -> None:
+        if generation is not None and generation != self._generation:
+            return
+
+        ttl = self._cache.ttl_seconds
+        if (exp := payload.get("exp")) is not None:
+            ttl = min(ttl, float(exp) - time.time())
+
+        self._cache.set(token, VerifiedToken(payload, user), ttl)
+        # expired and evicted tokens of the user go, so its set can't outgrow
+        # the cache however many tokens the user churns through
+        tokens = {known for known in self._users[user.id] if known in self._cache}
+        if token in self._cache:
+            tokens.add(token)
+        if tokens:
+            self._users[user.id] = tokens
+        else:
+            del self._users[user.id]
+
+        if len(self._users) > self._cache.max_size:
+            self._compact()
+        TOKEN_CACHE_ENTRIES.set(len(self._cache))
+
+    def discard(self, token: str) -> None:
+        if entry := self._cache.pop(token):
+            self._users.get(entry.user.id, set()).discard(token)
+            TOKEN_CACHE_ENTRIES.set(len(self._cache))
+
+    async def invalidate_user(self, user_id: uuid.UUID) -> None:
+        self._forget_user(user_id)
+        if self._invalidation is not None:
+            await self._invalidation.publish([f"{USER_KEY_PREFIX}{user_id}"])
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._users.clear()
+        TOKEN_CACHE_ENTRIES.set(0)
+
+    def stats(self) -> CacheStats:
+        return self._cache.stats()
+
+    def _forget_user(self, user_id: uuid.UUID) -> None:
+        self._generation += 1
+        for token in self._users.pop(user_id, set()):
+            self._cache.pop(token)
+        TOKEN_CACHE_ENTRIES.set(len(self._cache))
+
+    def _on_invalidate(self, keys: Optional[Sequence[str]]) -> None:
+        if keys is None:
+            self._generation += 1
+            self.clear()
+            return
+
+        for key in keys:
+            if key.startswith(USER_KEY_PREFIX):
+                self._forget_user(uuid.UUID(key[len(USER_KEY_PREFIX) :]))
+
+    def _compact(self) -> None:
+        # tokens evicted by other users' sets are left in the index,
+        # so drop the ones which are gone
+        for user_id in list(self._users):
+            alive = {token for token in self._users[user_id] if token in self._cache}
+            if alive:
+                self._users[user_id] = alive
+            else:
+                del self._users[user_id]
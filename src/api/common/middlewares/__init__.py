@@ -1,7 +1,10 @@
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
+from src.api.common.middlewares.metrics import MetricsMiddleware
 from src.api.common.middlewares.process_time import ProcessMiddleware
+from src.api.common.middlewares.profiling import ProfilingMiddleware
+from src.common.profiling import ProfileStore
 from src.core.settings import Settings
 
 
@@ -13,4 +16,15 @@ def setup_global_middlewares(app: FastAPI, settings: Settings) -> None:
         allow_methods=settings.server.methods,
         allow_headers=settings.server.headers,
     )
-    app.add_middleware(ProcessMiddleware)
+    app.add_middleware(ProcessMiddleware, server_timing=settings.server.timing)
+    if settings.metrics.enabled:
+        app.add_middleware(MetricsMiddleware)
+    if settings.profiling.enabled:
+        app.add_middleware(
+            ProfilingMiddleware,
+            store=ProfileStore(
+                settings.profiling.directory, settings.profiling.max_profiles
+            ),
+            token=settings.profiling.token,
+            header=settings.profiling.header,
+        )
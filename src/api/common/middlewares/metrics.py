@@ -0,0 +1,64 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.common.metrics import (
+    DB_POOL_CHECKOUTS_PER_REQUEST,
+    HTTP_REQUEST_SECONDS,
+    HTTP_REQUESTS_IN_FLIGHT,
+)
+from src.database.core.connection import (
+    PoolCheckouts,
+    reset_checkouts,
+    start_checkouts,
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Observes http requests by route template, e.g. `/api/v1/users/{user_id}`,
+    so the number of series doesn't depend on paths sent by clients.
+    Database connections checked out by each request are counted as well
+    """
+
+    __slots__ = ("app",)
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = 500
+
+        async def _send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        checkouts = PoolCheckouts()
+        token = start_checkouts(checkouts)
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            reset_checkouts(token)
+            # routers of the mounted apps fill the same scope in
+            route = scope.get("route")
+            template = (
+                f"{scope.get('root_path', '')}{route.path}"
+                if route is not None
+                else UNMATCHED_ROUTE
+            )
+            HTTP_REQUEST_SECONDS.labels(scope["method"], template, str(status)).observe(
+                time.perf_counter() - start
+            )
+            DB_POOL_CHECKOUTS_PER_REQUEST.labels(scope["method"], template).observe(
+                checkouts.count
+            )
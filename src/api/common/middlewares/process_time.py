@@ -1,25 +1,52 @@
 import time
-from typing import Awaitable, Callable
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
-from starlette.types import ASGIApp
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from src.common.timing import Timings, reset_timings, start_timings
 
-class ProcessMiddleware(BaseHTTPMiddleware):
-    __slots__ = ()
 
-    def __init__(self, app: ASGIApp) -> None:
-        super().__init__(app)
+def _server_timing(timings: Timings, total: float) -> str:
+    metrics = [
+        f"{phase};dur={seconds * 1000:.2f}" for phase, seconds in timings.phases.items()
+    ]
+    metrics.append(f"total;dur={total * 1000:.2f}")
+
+    return ", ".join(metrics)
+
+
+class ProcessMiddleware:
+    """
+    Adds `X-Process-Time` when the response starts, without buffering it.
+    With `server_timing` the time of every recorded phase
+    (auth, db, redis, hashing, serialization) is sent in `Server-Timing`.
+    """
+
+    __slots__ = ("app", "_server_timing")
+
+    def __init__(self, app: ASGIApp, server_timing: bool = False) -> None:
+        self.app = app
+        self._server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
 
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
-    ) -> Response:
         start = time.perf_counter()
-        response = await call_next(request)
-        stop = time.perf_counter() - start
+        timings = Timings() if self._server_timing else None
+        token = start_timings(timings) if timings is not None else None
 
-        response.headers["X-Process-Time"] = f"{stop:.5f}"
+        async def _send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                stop = time.perf_counter() - start
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Process-Time", f"{stop:.5f}")
+                if timings is not None:
+                    headers.append("Server-Timing", _server_timing(timings, stop))
+            await send(message)
 
-        return response
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            if token is not None:
+                reset_timings(token)
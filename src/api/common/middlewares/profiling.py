@@ -0,0 +1,62 @@
+import cProfile
+import hmac
+
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.common.profiling import ProfileStore
+
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+
+class ProfilingMiddleware:
+    """
+    Runs requests sent with the profiling token header under cProfile.
+    The result is saved into `ProfileStore`, its id is returned in `X-Profile-Id`.
+
+    cProfile sees the whole thread, so anything else running on the event loop
+    meanwhile ends up in the profile as well. Only one request per worker
+    is profiled at a time, the rest are served as usual.
+    """
+
+    __slots__ = ("app", "_header", "_token", "_store", "_busy")
+
+    def __init__(
+        self, app: ASGIApp, store: ProfileStore, token: str, header: str
+    ) -> None:
+        if not token:
+            raise ValueError("Profiling token is required")
+        self.app = app
+        self._store = store
+        self._token = token.encode()
+        self._header = header.lower().encode()
+        self._busy = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._busy or not self._requested(scope):
+            return await self.app(scope, receive, send)
+
+        profile_id = self._store.new_id()
+
+        async def _send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(PROFILE_ID_HEADER, profile_id)
+            await send(message)
+
+        self._busy = True
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            profiler.disable()
+            self._busy = False
+            await run_in_threadpool(self._store.save, profile_id, profiler)
+
+    def _requested(self, scope: Scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == self._header:
+                return hmac.compare_digest(value, self._token)
+
+        return False
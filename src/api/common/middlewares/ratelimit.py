@@ -0,0 +1,33 @@
+from starlette import status
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.api.common.ratelimit import RateLimiter, Rule, retry_headers
+from src.api.common.responses import DefaultJSONResponse
+
+
+class RateLimitMiddleware:
+    """Limits every http request by the client ip, before routing"""
+
+    __slots__ = ("app", "_limiter", "_rule")
+
+    def __init__(self, app: ASGIApp, limiter: RateLimiter, rule: Rule) -> None:
+        self.app = app
+        self._limiter = limiter
+        self._rule = rule
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        client = scope.get("client")
+        key = f"default:ip:{client[0] if client else 'unknown'}"
+        result = await self._limiter.hit(key, self._rule)
+        if not result.allowed:
+            response = DefaultJSONResponse(
+                {"message": "Too many requests, try again later"},
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers=retry_headers(result),
+            )
+            return await response(scope, receive, send)
+
+        await self.app(scope, receive, send)
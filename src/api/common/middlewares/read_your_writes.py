@@ -0,0 +1,66 @@
+import time
+from http.cookies import SimpleCookie
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.database.core.routing import (
+    ReadYourWrites,
+    reset_read_your_writes,
+    start_read_your_writes,
+)
+
+COOKIE_NAME = "primary_until"
+
+
+def _sticky_until(scope: Scope, window: float) -> float:
+    for name, value in scope["headers"]:
+        if name == b"cookie":
+            raw = cookie_parser(value.decode("latin-1")).get(COOKIE_NAME)
+            try:
+                # the client can't pin itself to the primary for longer than that
+                return min(float(raw or 0), time.time() + window)
+            except ValueError:
+                return 0.0
+
+    return 0.0
+
+
+class ReadYourWritesMiddleware:
+    """
+    After a request that wrote to the primary, the client gets a cookie that keeps
+    its reads on the primary for `window` seconds, until replicas catch up.
+    A cookie works with any number of workers and needs no storage
+    """
+
+    __slots__ = ("app", "_window")
+
+    def __init__(self, app: ASGIApp, window: float) -> None:
+        self.app = app
+        self._window = window
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        state = ReadYourWrites(_sticky_until(scope, self._window))
+        token = start_read_your_writes(state)
+
+        async def _send(message: Message) -> None:
+            if message["type"] == "http.response.start" and state.wrote:
+                cookie: SimpleCookie = SimpleCookie()
+                cookie[COOKIE_NAME] = f"{time.time() + self._window:.3f}"
+                cookie[COOKIE_NAME]["max-age"] = int(self._window) + 1
+                cookie[COOKIE_NAME]["path"] = "/"
+                cookie[COOKIE_NAME]["httponly"] = True
+                cookie[COOKIE_NAME]["samesite"] = "lax"
+                MutableHeaders(scope=message).append(
+                    "set-cookie", cookie.output(header="").strip()
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            reset_read_your_writes(token)
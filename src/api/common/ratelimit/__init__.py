@@ -0,0 +1,25 @@
+from src.api.common.ratelimit.dependency import (
+    RateLimit,
+    by_ip,
+    by_login,
+    by_user,
+    retry_headers,
+)
+from src.api.common.ratelimit.limiter import (
+    RateLimiter,
+    RateLimitResult,
+    Rule,
+    get_rate_limiter,
+)
+
+__all__ = (
+    "RateLimit",
+    "RateLimiter",
+    "RateLimitResult",
+    "Rule",
+    "by_ip",
+    "by_login",
+    "by_user",
+    "get_rate_limiter",
+    "retry_headers",
+)
@@ -0,0 +1,73 @@
+from typing import Annotated, Awaitable, Callable, Dict
+
+import orjson
+from fastapi import Depends, Request
+
+from src.api.common.providers import Stub
+from src.api.common.ratelimit.limiter import RateLimiter, RateLimitResult
+from src.common.exceptions import TooManyRequestsError
+
+KeyFunc = Callable[[Request], Awaitable[str]]
+
+
+async def by_ip(request: Request) -> str:
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+async def by_login(request: Request) -> str:
+    """Login from the json body, the body is already read and cached by then"""
+    try:
+        login = orjson.loads(await request.body()).get("login")
+    except (orjson.JSONDecodeError, AttributeError):
+        login = None
+    if not isinstance(login, str):
+        return await by_ip(request)
+
+    return f"login:{login.lower()}"
+
+
+async def by_user(request: Request) -> str:
+    """Requires `Authorization` to be resolved earlier in the same route"""
+    user = getattr(request.state, "user", None)
+    if user is None:
+        return await by_ip(request)
+
+    return f"user:{user.id}"
+
+
+def retry_headers(result: RateLimitResult) -> Dict[str, str]:
+    return {
+        "Retry-After": str(result.retry_after),
+        "X-RateLimit-Limit": str(result.limit),
+        "X-RateLimit-Remaining": str(result.remaining),
+    }
+
+
+class RateLimit:
+    """
+    Per-route limit by a named rule of `RateLimiter`.
+    Use it in the route `dependencies`, so it's checked before anything else.
+    A rule which is not configured doesn't limit anything.
+    """
+
+    __slots__ = ("_name", "_key")
+
+    def __init__(self, name: str, key: KeyFunc = by_ip) -> None:
+        self._name = name
+        self._key = key
+
+    async def __call__(
+        self,
+        request: Request,
+        limiter: Annotated[RateLimiter, Depends(Stub(RateLimiter))],
+    ) -> None:
+        rule = limiter.rule(self._name)
+        if rule is None:
+            return
+
+        identity = await self._key(request)
+        result = await limiter.hit(f"{self._name}:{identity}", rule)
+        if not result.allowed:
+            raise TooManyRequestsError(
+                "Too many requests, try again later", headers=retry_headers(result)
+            )
@@ -0,0 +1,239 @@
+import math
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Final, List, Literal, Mapping, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from src.api.common.cache.memory import MemoryCache
+from src.api.common.cache.redis import RedisCache, redis_command
+from src.core.logger import log
+from src.core.settings import RateLimitSettings
+
+AlgorithmType = Literal["token_bucket", "sliding_window"]
+
+PERIODS: Final[Dict[str, int]] = {
+    "second": 1,
+    "minute": 60,
+    "hour": 3600,
+    "day": 86_400,
+}
+_RULE_PATTERN: Final[re.Pattern[str]] = re.compile(
+    r"^\s*(\d+)\s*/\s*(\d*)\s*(second|minute|hour|day)s?\s*$"
+)
+
+# KEYS[1] - bucket hash; ARGV: capacity, period ms, now ms, cost
+# returns allowed, remaining, retry after ms
+TOKEN_BUCKET_SCRIPT: Final[str] = """
+local capacity = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local rate = capacity / period
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - ts, 0) * rate)
+local allowed = 0
+local retry = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry = math.ceil((cost - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], period)
+return {allowed, math.floor(tokens), retry}
+"""
+# KEYS[1] - current window counter, KEYS[2] - previous one
+# ARGV: limit, window ms, now ms, cost; returns allowed, remaining, retry after ms
+SLIDING_WINDOW_SCRIPT: Final[str] = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local elapsed = now % window
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local weighted = previous * (window - elapsed) / window + current
+if weighted + cost > limit then
+    local retry = window - elapsed
+    if previous > 0 and current + cost <= limit then
+        retry = math.ceil(window - elapsed - (limit - current - cost) * window / previous)
+    end
+    return {0, math.max(limit - math.ceil(weighted), 0), math.max(retry, 1)}
+end
+redis.call('INCRBY', KEYS[1], cost)
+redis.call('PEXPIRE', KEYS[1], window * 2)
+return {1, math.max(limit - math.ceil(weighted + cost), 0), 0}
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class Rule:
+    limit: int
+    period_seconds: float
+    algorithm: AlgorithmType = "token_bucket"
+
+    @classmethod
+    def parse(cls, value: str, algorithm: AlgorithmType = "token_bucket") -> "Rule":
+        """Parses rules like `5/minute`, `100/10 seconds`"""
+        match = _RULE_PATTERN.match(value)
+        if not match:
+            raise ValueError(f"Invalid rate limit rule: {value}")
+
+        limit, multiplier, period = match.groups()
+        return cls(
+            limit=int(limit),
+            period_seconds=int(multiplier or 1) * PERIODS[period],
+            algorithm=algorithm,
+        )
+
+    @property
+    def period_ms(self) -> int:
+        return int(self.period_seconds * 1000)
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after_ms: int
+
+    @property
+    def retry_after(self) -> int:
+        """Whole seconds, as expected by the `Retry-After` header"""
+        return max(math.ceil(self.retry_after_ms / 1000), 1)
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+class LocalRateLimiter:
+    """
+    Same algorithms over a per-worker memory, used while redis is unavailable.
+    Limits are not shared between workers here.
+    """
+
+    __slots__ = ("_state",)
+
+    def __init__(self, max_size: int = 10_000) -> None:
+        self._state: MemoryCache[str, List[float]] = MemoryCache(max_size)
+
+    def hit(self, key: str, rule: Rule, cost: int = 1) -> RateLimitResult:
+        if rule.algorithm == "sliding_window":
+            return self._sliding_window(key, rule, cost)
+        return self._token_bucket(key, rule, cost)
+
+    def _token_bucket(self, key: str, rule: Rule, cost: int) -> RateLimitResult:
+        now, period = _now_ms(), rule.period_ms
+        rate = rule.limit / period
+        tokens, ts = self._state.get(key) or (rule.limit, now)
+        tokens = min(rule.limit, tokens + max(now - ts, 0) * rate)
+
+        retry = 0
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        else:
+            retry = math.ceil((cost - tokens) / rate)
+
+        self._state.set(key, [tokens, now], period / 1000)
+        return RateLimitResult(allowed, rule.limit, math.floor(tokens), retry)
+
+    def _sliding_window(self, key: str, rule: Rule, cost: int) -> RateLimitResult:
+        now, window = _now_ms(), rule.period_ms
+        index, elapsed = divmod(now, window)
+        state = self._state.get(key)
+        current, previous = 0.0, 0.0
+        if state:
+            if state[0] == index:
+                current, previous = state[1], state[2]
+            elif state[0] == index - 1:
+                previous = state[1]
+
+        weighted = previous * (window - elapsed) / window + current
+        if weighted + cost > rule.limit:
+            retry = window - elapsed
+            if previous > 0 and current + cost <= rule.limit:
+                retry = math.ceil(
+                    window - elapsed - (rule.limit - current - cost) * window / previous
+                )
+            remaining = max(rule.limit - math.ceil(weighted), 0)
+            return RateLimitResult(False, rule.limit, remaining, max(retry, 1))
+
+        self._state.set(key, [index, current + cost, previous], window * 2 / 1000)
+        remaining = max(rule.limit - math.ceil(weighted + cost), 0)
+        return RateLimitResult(True, rule.limit, remaining, 0)
+
+
+class RateLimiter:
+    """
+    Distributed rate limiter, every check is a single atomic Lua call.
+
+    Named rules are configured once, so routes can refer to them by name.
+    Falls back to `LocalRateLimiter` if redis can't be reached.
+    """
+
+    __slots__ = ("_cache", "_rules", "_local", "_token_bucket", "_sliding_window")
+
+    def __init__(
+        self,
+        cache: RedisCache,
+        rules: Optional[Mapping[str, Rule]] = None,
+        fallback_size: int = 10_000,
+    ) -> None:
+        self._cache = cache
+        self._rules = dict(rules or {})
+        self._local = LocalRateLimiter(fallback_size)
+        self._token_bucket = cache.register_script(TOKEN_BUCKET_SCRIPT)
+        self._sliding_window = cache.register_script(SLIDING_WINDOW_SCRIPT)
+
+    def rule(self, name: str) -> Optional[Rule]:
+        return self._rules.get(name)
+
+    async def hit(self, key: str, rule: Rule, cost: int = 1) -> RateLimitResult:
+        try:
+            allowed, remaining, retry = await self._execute(key, rule, cost)
+        except (RedisError, OSError) as e:
+            log.warning(f"Rate limiter is using local fallback -> {e!r}")
+            return self._local.hit(key, rule, cost)
+
+        return RateLimitResult(bool(allowed), rule.limit, int(remaining), int(retry))
+
+    @redis_command("rate_limit")
+    async def _execute(self, key: str, rule: Rule, cost: int) -> Tuple[int, int, int]:
+        now, period = _now_ms(), rule.period_ms
+        # both window keys share the hash tag, so it also works on a cluster
+        base = f"ratelimit:{{{key}}}"
+        if rule.algorithm == "sliding_window":
+            index = now // period
+            keys = [f"{base}:{index}", f"{base}:{index - 1}"]
+            script = self._sliding_window
+        else:
+            keys = [base]
+            script = self._token_bucket
+
+        result = await script(keys=keys, args=(rule.limit, period, now, cost))
+        return result[0], result[1], result[2]
+
+
+def get_rate_limiter(cache: RedisCache, settings: RateLimitSettings) -> RateLimiter:
+    rules: Dict[str, Rule] = {}
+    if settings.enabled:
+        named = {
+            "default": settings.default,
+            "login": settings.login,
+            "login_ip": settings.login_ip,
+        }
+        rules = {
+            name: Rule.parse(value, settings.algorithm)
+            for name, value in named.items()
+            if value
+        }
+
+    return RateLimiter(cache, rules, fallback_size=settings.fallback_max_size)
@@ -4,12 +4,14 @@ from fastapi.responses import JSONResponse as _JSONResponse
 from starlette.background import BackgroundTask
 
 from src.common.serializers.json import json_dumps
+from src.common.timing import timed
 from src.common.types import ResultType
 
 
 class JSONResponse(_JSONResponse):
     def render(self, content: Any) -> bytes:
-        return json_dumps(content)
+        with timed("serialization"):
+            return json_dumps(content)
 
 
 class OkResponse(JSONResponse, Generic[ResultType]):
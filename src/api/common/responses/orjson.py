@@ -4,12 +4,14 @@ from fastapi.responses import ORJSONResponse as _ORJSONResponse
 from starlette.background import BackgroundTask
 
 from src.common.serializers.orjson import orjson_dumps
+from src.common.timing import timed
 from src.common.types import ResultType
 
 
 class ORJSONResponse(_ORJSONResponse):
     def render(self, content: Any) -> bytes:
-        return orjson_dumps(content)
+        with timed("serialization"):
+            return orjson_dumps(content)
 
 
 class OkResponse(ORJSONResponse, Generic[ResultType]):
@@ -0,0 +1,82 @@
+import threading
+import uuid
+from typing import Annotated, Literal
+
+from fastapi import APIRouter, Depends, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, PlainTextResponse
+
+from src.api.common.docs import (
+    ConflictError,
+    ForbiddenError,
+    NotFoundError,
+    UnAuthorizedError,
+)
+from src.api.common.providers import Stub
+from src.api.v1.handlers.auth import ADMIN, Authorization
+from src.common import exceptions
+from src.common.profiling import ProfileStore, StackSampler
+from src.core.settings import ProfilingSettings
+
+profiler_router = APIRouter(
+    tags=["profiler"],
+    dependencies=[Depends(Authorization(ADMIN))],
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {"model": UnAuthorizedError},
+        status.HTTP_403_FORBIDDEN: {"model": ForbiddenError},
+    },
+)
+
+
+@profiler_router.get(
+    "/sample",
+    response_class=PlainTextResponse,
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_409_CONFLICT: {"model": ConflictError}},
+)
+async def sample_endpoint(
+    settings: Annotated[ProfilingSettings, Depends(Stub(ProfilingSettings))],
+    sampler: Annotated[StackSampler, Depends(Stub(StackSampler))],
+    seconds: Annotated[float, Query(gt=0)] = 10.0,
+    interval_ms: Annotated[float, Query(ge=1, le=1000)] = 5.0,
+) -> PlainTextResponse:
+    """
+    Samples the event loop of the worker which got the request,
+    returns collapsed stacks, e.g. for flamegraph.pl or speedscope
+    """
+    if seconds > settings.max_sample_seconds:
+        raise exceptions.BadRequestError(
+            f"Can't sample longer than {settings.max_sample_seconds} seconds"
+        )
+    stacks = await run_in_threadpool(
+        sampler.sample, threading.get_ident(), seconds, interval_ms / 1000
+    )
+    if stacks is None:
+        raise exceptions.ConflictError("Sampler is already running")
+
+    return PlainTextResponse(stacks)
+
+
+@profiler_router.get(
+    "/requests/{profile_id}",
+    response_class=Response,
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_404_NOT_FOUND: {"model": NotFoundError}},
+)
+async def request_profile_endpoint(
+    profile_id: uuid.UUID,
+    store: Annotated[ProfileStore, Depends(Stub(ProfileStore))],
+    format: Literal["text", "pstats"] = "text",
+) -> Response:
+    """Profile of a request sent with the token header, by its `X-Profile-Id`"""
+    if not store.exists(profile_id.hex):
+        raise exceptions.NotFoundError("Profile not found")
+
+    if format == "pstats":
+        return FileResponse(
+            store.path(profile_id.hex),
+            media_type="application/octet-stream",
+            filename=f"{profile_id.hex}.prof",
+        )
+
+    return PlainTextResponse(await run_in_threadpool(store.render, profile_id.hex))
@@ -0,0 +1,40 @@
+from typing import Any, Optional, Tuple
+
+from fastapi import FastAPI
+
+from src.api.common.cache.token import TokenCache
+from src.api.common.exceptions import setup_exception_handlers
+from src.api.common.responses import DefaultJSONResponse
+from src.api.profiler.endpoints import profiler_router
+from src.api.v1.dependencies import singleton
+from src.common.profiling import ProfileStore, StackSampler
+from src.core.logger import log
+from src.core.settings import ProfilingSettings, Settings
+from src.database import DBGateway
+from src.services.security.jwt import TokenJWT
+
+
+def init_app_profiler(
+    settings: Settings, api: FastAPI, **kw: Any
+) -> Tuple[str, FastAPI, Optional[str]]:
+    """Endpoints are for admins, authorized by the same dependencies as `api`"""
+    log.info("Initialize Profiler API")
+    app = FastAPI(
+        title="Profiler",
+        default_response_class=DefaultJSONResponse,
+        docs_url=None,
+        redoc_url=None,
+        swagger_ui_oauth2_redirect_url=None,
+        **kw,
+    )
+    app.include_router(profiler_router)
+    for dependency in (TokenJWT, DBGateway, TokenCache):
+        app.dependency_overrides[dependency] = api.dependency_overrides[dependency]
+    app.dependency_overrides[ProfilingSettings] = singleton(settings.profiling)
+    app.dependency_overrides[StackSampler] = singleton(StackSampler())
+    app.dependency_overrides[ProfileStore] = singleton(
+        ProfileStore(settings.profiling.directory, settings.profiling.max_profiles)
+    )
+    setup_exception_handlers(app)
+
+    return ("/profiler", app, None)
@@ -1,11 +1,69 @@
-from typing import Any, Optional, Tuple
+from contextlib import asynccontextmanager
+from typing import Any, AsyncContextManager, AsyncIterator, Callable, Optional, Tuple
 
 from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncEngine
 
+from src.api.common.cache.tiered import InvalidationChannel, TieredCache
 from src.api.common.middlewares import setup_global_middlewares
 from src.api.common.responses import DefaultJSONResponse
+from src.common.metrics import REGISTRY
 from src.core.logger import log
 from src.core.settings import Settings
+from src.database.core.routing import DatabaseRouter
+from src.services.security.argon2 import AsyncArgon2
+
+
+async def _startup(app: FastAPI) -> None:
+    cache = getattr(app.state, "cache", None)
+    if isinstance(cache, TieredCache):
+        await cache.start()
+    # shared with a tiered cache, starting it twice is a no-op
+    invalidation = getattr(app.state, "invalidation", None)
+    if isinstance(invalidation, InvalidationChannel):
+        await invalidation.start()
+    router = getattr(app.state, "db_router", None)
+    if isinstance(router, DatabaseRouter):
+        await router.start()
+
+
+async def _shutdown(app: FastAPI) -> None:
+    cache = getattr(app.state, "cache", None)
+    if isinstance(cache, TieredCache):
+        await cache.stop()
+    invalidation = getattr(app.state, "invalidation", None)
+    if isinstance(invalidation, InvalidationChannel):
+        await invalidation.stop()
+    router = getattr(app.state, "db_router", None)
+    if isinstance(router, DatabaseRouter):
+        await router.stop()
+    engine = getattr(app.state, "engine", None)
+    if isinstance(engine, AsyncEngine):
+        await engine.dispose()
+    hasher = getattr(app.state, "hasher", None)
+    if isinstance(hasher, AsyncArgon2):
+        hasher.shutdown()
+
+
+def _lifespan(
+    *apps: FastAPI,
+) -> Callable[[FastAPI], AsyncContextManager[None]]:
+    """
+    Starlette runs lifespan events of the root app only, never of the mounted ones,
+    so resources of the mounted apps are started and stopped from here
+    """
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        for app in apps:
+            await _startup(app)
+        try:
+            yield
+        finally:
+            for app in reversed(apps):
+                await _shutdown(app)
+
+    return lifespan
 
 
 def init_app(
@@ -14,11 +72,15 @@ def init_app(
     **kw: Any,
 ) -> FastAPI:
     log.info("Initialize General")
+    if settings.metrics.directory:
+        # before gunicorn forks workers, each of them gets its own files then
+        REGISTRY.configure(settings.metrics.directory)
     app = FastAPI(
         default_response_class=DefaultJSONResponse,
         docs_url=None,
         redoc_url=None,
         swagger_ui_oauth2_redirect_url=None,
+        lifespan=_lifespan(*(sub_app for _, sub_app, _ in sub_apps)),
         **kw,
     )
     for apps in sub_apps:
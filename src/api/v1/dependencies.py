@@ -1,18 +1,28 @@
-from typing import Callable, TypeVar
+from typing import Any, Callable, Dict, TypeVar
 
 from fastapi import FastAPI
 
 from src.api.common.cache.redis import RedisCache, get_redis
+from src.api.common.cache.session import RefreshSessionStore
+from src.api.common.cache.tiered import get_invalidation_channel, get_tiered_redis
+from src.api.common.cache.token import TokenCache
+from src.api.common.ratelimit import RateLimiter, get_rate_limiter
 from src.api.v1.handlers.commands import CommandMediatorProtocol
 from src.api.v1.handlers.commands.mediator import CommandMediator
 from src.api.v1.handlers.commands.setup import setup_command_mediator
-from src.common.interfaces.hasher import AbstractHasher
+from src.common.interfaces.hasher import AbstractAsyncHasher, AbstractHasher
 from src.core.settings import Settings
 from src.database import DBGateway, create_database_factory
-from src.database.core.connection import create_sa_engine, create_sa_session_factory
+from src.database.core.connection import (
+    asyncpg_connect_args,
+    create_sa_engine,
+    create_sa_session_factory,
+)
 from src.database.core.manager import TransactionManager
+from src.database.core.routing import DatabaseRouter
 from src.services import create_service_gateway_factory
-from src.services.security.argon2 import get_argon2_hasher
+from src.services.security.argon2 import get_argon2_hasher, get_async_argon2_hasher
+from src.services.security.cursor import CursorSigner
 from src.services.security.jwt import TokenJWT
 
 DependencyType = TypeVar("DependencyType")
@@ -26,32 +36,80 @@ def singleton(value: DependencyType) -> Callable[[], DependencyType]:
 
 
 def setup_dependencies(app: FastAPI, settings: Settings) -> None:
-    engine = create_sa_engine(
-        settings.db.url,
-        pool_size=settings.db.connection_pool_size,
-        max_overflow=settings.db.connection_max_overflow,
-        pool_pre_ping=settings.db.connection_pool_pre_ping,
-    )
+    engine_options: Dict[str, Any] = {
+        "pool_size": settings.db.connection_pool_size,
+        "max_overflow": settings.db.connection_max_overflow,
+        "pool_pre_ping": settings.db.connection_pool_pre_ping,
+        "query_cache_size": settings.db.query_cache_size,
+    }
+    if "asyncpg" in settings.db.uri:
+        engine_options["connect_args"] = asyncpg_connect_args(
+            settings.db.prepared_statement_cache_size,
+            settings.db.statement_cache_size,
+            settings.db.pgbouncer,
+        )
+    engine = create_sa_engine(settings.db.url, **engine_options)
     app.state.engine = engine
-    session_factory = create_sa_session_factory(engine)
+    router = None
+    if settings.db.replicas:
+        router = DatabaseRouter(
+            engine,
+            [create_sa_engine(url, **engine_options) for url in settings.db.replicas],
+            max_lag=settings.db.replica_max_lag_seconds,
+            check_interval=settings.db.replica_check_interval_seconds,
+        )
+        app.state.db_router = router
+    session_factory = create_sa_session_factory(engine, router)
     database_factory = create_database_factory(TransactionManager, session_factory)
     service_factory = create_service_gateway_factory(database_factory)
-    redis = get_redis(settings.redis)
+    redis = (
+        get_tiered_redis(settings.redis, settings.cache)
+        if settings.cache.local_enabled
+        else get_redis(settings.redis)
+    )
+    app.state.cache = redis
+    limiter = get_rate_limiter(redis, settings.rate_limit)
+    app.state.limiter = limiter
     jwt = TokenJWT(settings.ciphers)
-    hasher = get_argon2_hasher()
+    # tokens of a user are dropped in every worker, with or without a local layer
+    invalidation = get_invalidation_channel(settings.redis, redis)
+    app.state.invalidation = invalidation
+    token_cache = TokenCache(
+        settings.cache.token_max_size,
+        settings.cache.token_ttl_seconds,
+        invalidation=invalidation,
+    )
+    hasher = get_argon2_hasher(settings.hasher.profile)
+    async_hasher = get_async_argon2_hasher(
+        hasher,
+        executor=settings.hasher.executor,
+        workers=settings.hasher.workers,
+        max_pending=settings.hasher.max_pending,
+        max_batch_pending=settings.hasher.max_batch_pending,
+    )
+    app.state.hasher = async_hasher
 
     mediator = CommandMediator()
     setup_command_mediator(
         mediator,
         gateway=service_factory,
+        # the factory itself, not a gateway, is what the command gets
+        gateway_factory=singleton(service_factory),
         settings=settings,
         cache=redis,
         jwt=jwt,
-        hasher=hasher,
+        hasher=async_hasher,
+        cursor_signer=CursorSigner(settings.ciphers),
     )
 
     app.dependency_overrides[CommandMediatorProtocol] = singleton(mediator)
     app.dependency_overrides[RedisCache] = singleton(redis)
+    app.dependency_overrides[RefreshSessionStore] = singleton(
+        RefreshSessionStore(redis)
+    )
     app.dependency_overrides[TokenJWT] = singleton(jwt)
+    app.dependency_overrides[TokenCache] = singleton(token_cache)
+    app.dependency_overrides[RateLimiter] = singleton(limiter)
     app.dependency_overrides[DBGateway] = database_factory
     app.dependency_overrides[AbstractHasher] = singleton(hasher)
+    app.dependency_overrides[AbstractAsyncHasher] = singleton(async_hasher)
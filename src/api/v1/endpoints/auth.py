@@ -2,7 +2,13 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, status
 
-from src.api.common.docs import ForbiddenError, NotFoundError, UnAuthorizedError
+from src.api.common.docs import (
+    ForbiddenError,
+    NotFoundError,
+    TooManyRequestsError,
+    UnAuthorizedError,
+)
+from src.api.common.ratelimit import RateLimit, by_login
 from src.api.common.responses import OkResponse
 from src.api.v1.handlers.auth import Authorization
 from src.api.v1.handlers.login import Login
@@ -18,7 +24,13 @@ auth_router = APIRouter(prefix="/auth", tags=["auth"])
     responses={
         status.HTTP_404_NOT_FOUND: {"model": NotFoundError},
         status.HTTP_401_UNAUTHORIZED: {"model": UnAuthorizedError},
+        status.HTTP_429_TOO_MANY_REQUESTS: {"model": TooManyRequestsError},
     },
+    # checked before the password is hashed
+    dependencies=[
+        Depends(RateLimit("login_ip")),
+        Depends(RateLimit("login", key=by_login)),
+    ],
 )
 async def login_endpoint(
     login: Annotated[TokensExpire, Depends(Login())],
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Response, status
+from fastapi.concurrency import run_in_threadpool
+
+from src.common.metrics import CONTENT_TYPE, REGISTRY
+
+metrics_router = APIRouter(tags=["metrics"])
+
+
+@metrics_router.get(
+    "/metrics",
+    response_class=Response,
+    status_code=status.HTTP_200_OK,
+    include_in_schema=False,
+)
+async def metrics_endpoint() -> Response:
+    # reads files of every worker, so it's kept off the event loop
+    content = await run_in_threadpool(REGISTRY.render)
+    return Response(content, media_type=CONTENT_TYPE)
@@ -1,9 +1,11 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
 
 import src.common.dto as dto
 from src.api.common.docs import (
+    BadRequestError,
     ConflictError,
     ForbiddenError,
     NotFoundError,
@@ -11,9 +13,17 @@ from src.api.common.docs import (
 )
 from src.api.common.providers import Stub
 from src.api.common.responses import OkResponse
-from src.api.v1.handlers.auth import Authorization
-from src.api.v1.handlers.commands import CommandMediatorProtocol, GetUserQuery
-from src.common.interfaces.hasher import AbstractHasher
+from src.api.v1.handlers.auth import ADMIN, Authorization
+from src.api.v1.handlers.commands import (
+    CommandMediatorProtocol,
+    ExportUsersQuery,
+    GetUserQuery,
+    GetUsersQuery,
+    ImportUsersQuery,
+)
+from src.api.v1.handlers.commands.user.export import ExportFormat
+from src.api.v1.handlers.commands.user.upload import ImportFormat
+from src.common.interfaces.hasher import AbstractAsyncHasher
 
 user_router = APIRouter(prefix="/users", tags=["user"])
 
@@ -31,7 +41,7 @@ async def create_user_endpoint(
     mediator: Annotated[
         CommandMediatorProtocol, Depends(Stub(CommandMediatorProtocol))
     ],
-    hasher: Annotated[AbstractHasher, Depends(Stub(AbstractHasher))],
+    hasher: Annotated[AbstractAsyncHasher, Depends(Stub(AbstractAsyncHasher))],
 ) -> OkResponse[dto.User]:
     result = await mediator.send(body, hasher=hasher)
     return OkResponse(result, status_code=status.HTTP_201_CREATED)
@@ -55,3 +65,79 @@ async def get_me_endpoint(
 ) -> OkResponse[dto.User]:
     result = await mediator.send(GetUserQuery(user_id=user.id))
     return OkResponse(result)
+
+
+@user_router.get(
+    "",
+    response_model=dto.UsersPage,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"model": BadRequestError},
+        status.HTTP_401_UNAUTHORIZED: {"model": UnAuthorizedError},
+        status.HTTP_403_FORBIDDEN: {"model": ForbiddenError},
+    },
+)
+async def get_users_endpoint(
+    _: Annotated[dto.User, Depends(Authorization(ADMIN))],
+    mediator: Annotated[
+        CommandMediatorProtocol, Depends(Stub(CommandMediatorProtocol))
+    ],
+    cursor: Annotated[Optional[str], Query(max_length=128)] = None,
+    limit: Annotated[int, Query(ge=1, le=500)] = 50,
+) -> OkResponse[dto.UsersPage]:
+    result = await mediator.send(GetUsersQuery(cursor=cursor, limit=limit))
+    return OkResponse(result)
+
+
+@user_router.get(
+    "/export",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_200_OK: {"content": {"application/x-ndjson": {}, "text/csv": {}}},
+        status.HTTP_401_UNAUTHORIZED: {"model": UnAuthorizedError},
+        status.HTTP_403_FORBIDDEN: {"model": ForbiddenError},
+    },
+)
+async def export_users_endpoint(
+    _: Annotated[dto.User, Depends(Authorization(ADMIN))],
+    mediator: Annotated[
+        CommandMediatorProtocol, Depends(Stub(CommandMediatorProtocol))
+    ],
+    format: ExportFormat = "ndjson",
+) -> StreamingResponse:
+    chunks = await mediator.send(ExportUsersQuery(format=format))
+    return StreamingResponse(
+        chunks,
+        media_type="text/csv" if format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'},
+    )
+
+
+@user_router.post(
+    "/import",
+    response_model=dto.ImportedUsers,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"model": BadRequestError},
+        status.HTTP_401_UNAUTHORIZED: {"model": UnAuthorizedError},
+        status.HTTP_403_FORBIDDEN: {"model": ForbiddenError},
+    },
+)
+async def import_users_endpoint(
+    request: Request,
+    _: Annotated[dto.User, Depends(Authorization(ADMIN))],
+    mediator: Annotated[
+        CommandMediatorProtocol, Depends(Stub(CommandMediatorProtocol))
+    ],
+    hasher: Annotated[AbstractAsyncHasher, Depends(Stub(AbstractAsyncHasher))],
+    format: ImportFormat = "ndjson",
+) -> OkResponse[dto.ImportedUsers]:
+    """
+    The body is NDJSON of `{"login", "password"}` objects,
+    or CSV with a `login,password` header
+    """
+    result = await mediator.send(
+        ImportUsersQuery(format=format), hasher=hasher, body=request.stream()
+    )
+    return OkResponse(result)
@@ -1,5 +1,5 @@
 import uuid
-from typing import Annotated, Any, Literal, Optional
+from typing import Annotated, Callable, Dict, Final, Literal, Optional
 
 from fastapi import Depends, Request
 from fastapi.concurrency import run_in_threadpool
@@ -7,31 +7,47 @@ from fastapi.openapi.models import HTTPBearer as HTTPBearerModel
 from fastapi.security.base import SecurityBase
 from fastapi.security.utils import get_authorization_scheme_param
 
-from src.api.common.cache.redis import RedisCache
+from src.api.common.cache.session import RefreshSessionStore
+from src.api.common.cache.token import TokenCache
 from src.api.common.providers import Stub
 from src.common.dto import Fingerprint, Status, Tokens, TokensExpire, User
 from src.common.exceptions import ForbiddenError
+from src.common.timing import timer
 from src.database import DBGateway
-from src.database.converter import from_model_to_dto
+from src.database.converter import dto_columns, from_models_to_dtos
 from src.services.security.jwt import TokenJWT
 
 TokenType = Literal["access", "refresh"]
+Permission = Literal["admin"]
+
+ADMIN: Final[Permission] = "admin"
+
+_PERMISSIONS: Final[Dict[Permission, Callable[[User], bool]]] = {
+    ADMIN: lambda user: user.is_admin,
+}
 
 
 class Authorization(SecurityBase):
-    def __init__(self, *permissions: Any) -> None:
+    def __init__(self, *permissions: Permission) -> None:
         self.model = HTTPBearerModel()
         self.scheme_name = type(self).__name__
-        self._permission = permissions
+        self._permissions = permissions
 
     async def __call__(
         self,
         request: Request,
         jwt: Annotated[TokenJWT, Depends(Stub(TokenJWT))],
         database: Annotated[DBGateway, Depends(Stub(DBGateway))],
+        token_cache: Annotated[TokenCache, Depends(Stub(TokenCache))],
     ) -> User:
         token = self._get_token(request)
-        return await self._verify_token(jwt, database, token, "access")
+        user = await self._verify_token(jwt, database, token, "access", token_cache)
+        if not all(_PERMISSIONS[permission](user) for permission in self._permissions):
+            raise ForbiddenError("Not enough permissions")
+        # lets later dependencies of the route, e.g. rate limits, key by the user
+        request.state.user = user
+
+        return user
 
     async def verify_refresh(
         self,
@@ -40,36 +56,19 @@ class Authorization(SecurityBase):
         request: Request,
         jwt: Annotated[TokenJWT, Depends(Stub(TokenJWT))],
         database: Annotated[DBGateway, Depends(Stub(DBGateway))],
-        cache: Annotated[RedisCache, Depends(Stub(RedisCache))],
+        sessions: Annotated[RefreshSessionStore, Depends(Stub(RefreshSessionStore))],
     ) -> TokensExpire:
         token = request.cookies.get("refresh_token", "")
         user = await self._verify_token(jwt, database, token, "refresh")
-        
-        token_pairs = await cache.get_list(str(user.id))
-        verified: Optional[str] = None
-
-        for pair in token_pairs:
-            data = pair.split("::")
-            if len(data) < 2:
-                await cache.delete(str(user.id))
-                raise ForbiddenError(
-                    "Broken separator, try to login again. Token is not valid anymore"
-                )
-            fp, cached_token, *_ = data
-            if fp == body.fingerprint and cached_token == token:
-                verified = pair
-                break
-
-        if not verified:
-            await cache.delete(str(user.id))
-            raise ForbiddenError("Token is not valid anymore")
 
-        await cache.pop(str(user.id), verified)
         _, access = await run_in_threadpool(jwt.create, typ="access", sub=str(user.id))
         expire, refresh = await run_in_threadpool(
             jwt.create, typ="refresh", sub=str(user.id)
         )
-        await cache.set_list(str(user.id), f"{body.fingerprint}::{refresh.token}")
+        if not await sessions.rotate(
+            user.id, body.fingerprint, token, refresh.token, expire
+        ):
+            raise ForbiddenError("Token is not valid anymore")
 
         return TokensExpire(
             refresh_expire=expire,
@@ -81,43 +80,53 @@ class Authorization(SecurityBase):
         request: Request,
         jwt: Annotated[TokenJWT, Depends(Stub(TokenJWT))],
         database: Annotated[DBGateway, Depends(Stub(DBGateway))],
-        cache: Annotated[RedisCache, Depends(Stub(RedisCache))],
+        sessions: Annotated[RefreshSessionStore, Depends(Stub(RefreshSessionStore))],
+        token_cache: Annotated[TokenCache, Depends(Stub(TokenCache))],
     ) -> Status:
         token = request.cookies.get("refresh_token", "")
         user = await self._verify_token(jwt, database, token, "refresh")
-        token_pairs = await cache.get_list(str(user.id))
-        for pair in token_pairs:
-            data = pair.split("::")
-            if len(data) < 2:
-                await cache.delete(str(user.id))
-                break
-            _, cached_token, *_ = data
-            if cached_token == token:
-                await cache.pop(str(user.id), pair)
-                break
+        await sessions.revoke(user.id, token)
+        await token_cache.invalidate_user(user.id)
 
         return Status(ok=True)
 
+    @timer("auth")
     async def _verify_token(
         self,
         jwt: TokenJWT,
         database: DBGateway,
         token: str,
         token_type: TokenType,
+        token_cache: Optional[TokenCache] = None,
     ) -> User:
+        if token_cache and (cached := token_cache.get(token)):
+            if cached.payload.get("type") != token_type:
+                raise ForbiddenError("Invalid token")
+            return cached.user
+
         payload = await run_in_threadpool(jwt.verify_token, token)
         user_id = payload.get("sub")
         actual_token_type = payload.get("type")
 
         if actual_token_type != token_type:
             raise ForbiddenError("Invalid token")
+        # a user invalidated while it is loaded must not be cached
+        generation = token_cache.generation if token_cache else None
         async with database:
-            user = await database.user().get_one(user_id=uuid.UUID(user_id))
+            repository = database.user()
+            row = await repository.get_one_row(
+                *dto_columns(repository.model, User), user_id=uuid.UUID(user_id)
+            )
 
-        if not user:
+        if row is None:
             raise ForbiddenError("Not authenticated")
 
-        return from_model_to_dto(user, User)
+        result = from_models_to_dtos((row,), User)[0]
+        # refresh tokens are single use, so only access ones are worth caching
+        if token_cache and token_type == "access":
+            token_cache.set(token, payload, result, generation)
+
+        return result
 
     def _get_token(self, request: Request) -> str:
         authorization = request.headers.get("Authorization")
@@ -1,6 +1,7 @@
 import inspect
 from typing import (
     Any,
+    AsyncIterator,
     Dict,
     Optional,
     Protocol,
@@ -19,15 +20,27 @@ from src.api.v1.handlers.commands.base import QT, RT, Command, CommandProtocol
 from src.api.v1.handlers.commands.mediator import AwaitableProxy, CommandType
 from src.api.v1.handlers.commands.user import (
     CreateUserCommand,
+    ExportUsersCommand,
+    ExportUsersQuery,
     GetUserCommand,
     GetUserQuery,
+    GetUsersCommand,
+    GetUsersQuery,
+    ImportUsersCommand,
+    ImportUsersQuery,
 )
-from src.common.interfaces.hasher import AbstractHasher
+from src.common.interfaces.hasher import AbstractAsyncHasher
 
 __all__ = (
     "CreateUserCommand",
     "GetUserQuery",
     "GetUserCommand",
+    "GetUsersQuery",
+    "GetUsersCommand",
+    "ExportUsersQuery",
+    "ExportUsersCommand",
+    "ImportUsersQuery",
+    "ImportUsersCommand",
 )
 
 
@@ -36,10 +49,26 @@ class CommandMediatorProtocol(Protocol):
     # it need to auto registry your command and also typing in routes
     @overload
     def send(
-        self, query: dto.CreateUser, *, hasher: AbstractHasher
+        self, query: dto.CreateUser, *, hasher: AbstractAsyncHasher
     ) -> AwaitableProxy[CreateUserCommand, dto.User]: ...
     @overload
     def send(self, query: GetUserQuery) -> AwaitableProxy[GetUserCommand, dto.User]: ...
+    @overload
+    def send(
+        self, query: GetUsersQuery
+    ) -> AwaitableProxy[GetUsersCommand, dto.UsersPage]: ...
+    @overload
+    def send(
+        self, query: ExportUsersQuery
+    ) -> AwaitableProxy[ExportUsersCommand, AsyncIterator[bytes]]: ...
+    @overload
+    def send(
+        self,
+        query: ImportUsersQuery,
+        *,
+        hasher: AbstractAsyncHasher,
+        body: AsyncIterator[bytes],
+    ) -> AwaitableProxy[ImportUsersCommand, dto.ImportedUsers]: ...
 
     # default one, should leave unchanged at the bottom of the protocol
     def send(self, query: QT, **kwargs: Any) -> AwaitableProxy[CommandType, RT]: ...
@@ -1,8 +1,27 @@
 from src.api.v1.handlers.commands.user.create import CreateUserCommand
-from src.api.v1.handlers.commands.user.select import GetUserCommand, GetUserQuery
+from src.api.v1.handlers.commands.user.export import (
+    ExportUsersCommand,
+    ExportUsersQuery,
+)
+from src.api.v1.handlers.commands.user.select import (
+    GetUserCommand,
+    GetUserQuery,
+    GetUsersCommand,
+    GetUsersQuery,
+)
+from src.api.v1.handlers.commands.user.upload import (
+    ImportUsersCommand,
+    ImportUsersQuery,
+)
 
 __all__ = (
     "CreateUserCommand",
     "GetUserQuery",
     "GetUserCommand",
+    "GetUsersQuery",
+    "GetUsersCommand",
+    "ExportUsersQuery",
+    "ExportUsersCommand",
+    "ImportUsersQuery",
+    "ImportUsersCommand",
 )
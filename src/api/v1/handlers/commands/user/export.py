@@ -0,0 +1,45 @@
+from operator import attrgetter
+from typing import Any, AsyncIterator, Literal
+
+import src.common.dto as dto
+from src.api.v1.handlers.commands.base import Command
+from src.common.serializers.csv import csv_dumps
+from src.common.serializers.orjson import orjson_dumps_lines
+from src.services.gateway import ServiceGateway
+
+ExportFormat = Literal["ndjson", "csv"]
+
+
+class ExportUsersQuery(dto.DTO):
+    format: ExportFormat = "ndjson"
+
+
+class ExportUsersCommand(Command[ExportUsersQuery, AsyncIterator[bytes]]):
+    """
+    Returns a lazy stream of serialized chunks. The session is opened on the first
+    chunk and lives as long as the stream, so the caller must consume or close it.
+    Each chunk is fetched only after the previous one has been sent, so a slow client
+    holds back the database cursor instead of growing a buffer
+    """
+
+    __slots__ = ("_gateway",)
+
+    def __init__(self, gateway: ServiceGateway) -> None:
+        self._gateway = gateway
+
+    async def execute(
+        self, query: ExportUsersQuery, **kwargs: Any
+    ) -> AsyncIterator[bytes]:
+        return self._stream(query.format)
+
+    async def _stream(self, format: ExportFormat) -> AsyncIterator[bytes]:
+        fields = tuple(dto.User.model_fields)
+        row = attrgetter(*fields)
+        async with self._gateway:
+            if format == "csv":
+                yield csv_dumps([fields])
+            async for users in self._gateway.user().export():
+                if format == "csv":
+                    yield csv_dumps([row(user) for user in users])
+                else:
+                    yield orjson_dumps_lines(users)
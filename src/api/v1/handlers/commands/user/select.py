@@ -1,21 +1,63 @@
 import uuid
-from typing import Any
+from typing import Any, Optional
+
+from pydantic import Field
 
 import src.common.dto as dto
+from src.api.common.cache.decorators import cached
+from src.api.common.cache.redis import ONE_MINUTE, RedisCache
 from src.api.v1.handlers.commands.base import Command
+from src.services import ServiceGatewayFactory
 from src.services.gateway import ServiceGateway
+from src.services.security.cursor import CursorSigner
 
 
 class GetUserQuery(dto.DTO):
     user_id: uuid.UUID
 
 
+class GetUsersQuery(dto.DTO):
+    cursor: Optional[str] = Field(default=None, max_length=128)
+    limit: int = Field(default=50, ge=1, le=500)
+
+
 class GetUserCommand(Command[GetUserQuery, dto.User]):
-    __slots__ = ("_gateway",)
+    __slots__ = ("_gateway_factory", "_cache")
+
+    def __init__(
+        self, gateway_factory: ServiceGatewayFactory, cache: RedisCache
+    ) -> None:
+        self._gateway_factory = gateway_factory
+        self._cache = cache
 
-    def __init__(self, gateway: ServiceGateway) -> None:
+    @cached(
+        key="user:{query.user_id}",
+        dto=dto.User,
+        ttl=ONE_MINUTE,
+        stale_ttl=ONE_MINUTE,
+        tags=("user:{query.user_id}",),
+    )
+    async def execute(self, /, query: GetUserQuery, **kwargs: Any) -> dto.User:
+        # shared by concurrent requests and refreshed after them, see `cached`
+        async with self._gateway_factory() as gateway:
+            return await gateway.user().get_one(user_id=query.user_id)
+
+
+class GetUsersCommand(Command[GetUsersQuery, dto.UsersPage]):
+    __slots__ = ("_gateway", "_cursor_signer")
+
+    def __init__(self, gateway: ServiceGateway, cursor_signer: CursorSigner) -> None:
         self._gateway = gateway
+        self._cursor_signer = cursor_signer
 
-    async def execute(self, query: GetUserQuery, **kwargs: Any) -> dto.User:
+    async def execute(self, query: GetUsersQuery, **kwargs: Any) -> dto.UsersPage:
+        after = self._cursor_signer.decode(query.cursor) if query.cursor else None
         async with self._gateway:
-            return await self._gateway.user().get_one(user_id=query.user_id)
+            users, last = await self._gateway.user().get_page(
+                after=after, limit=query.limit
+            )
+
+        return dto.UsersPage(
+            items=users,
+            next_cursor=self._cursor_signer.encode(last) if last else None,
+        )
@@ -0,0 +1,92 @@
+import csv
+from typing import Any, AsyncIterator, List, Literal, Optional, Tuple
+
+from pydantic import ValidationError
+
+import src.common.dto as dto
+from src.api.v1.handlers.commands.base import Command
+from src.common.exceptions import BadRequestError
+from src.services.gateway import ServiceGateway
+
+ImportFormat = Literal["ndjson", "csv"]
+BATCH_SIZE = 1000
+MAX_LINE_SIZE = 64 * 1024
+
+
+class ImportUsersQuery(dto.DTO):
+    format: ImportFormat = "ndjson"
+
+
+async def _iter_lines(body: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    buffer = b""
+    async for chunk in body:
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        if len(buffer) > MAX_LINE_SIZE:
+            raise BadRequestError("Line is too long")
+        for line in lines:
+            yield line
+    yield buffer
+
+
+def _parse_csv(line: bytes, header: List[str]) -> dto.CreateUser:
+    (values,) = csv.reader([line.decode()])
+    return dto.CreateUser.model_validate(dict(zip(header, values, strict=True)))
+
+
+async def _iter_batches(
+    body: AsyncIterator[bytes],
+    format: ImportFormat,
+    invalid: List[dto.SkippedUser],
+) -> AsyncIterator[List[Tuple[int, dto.CreateUser]]]:
+    """Validated `(line, user)` batches, lines that fail go to `invalid`"""
+    header: Optional[List[str]] = None
+    batch: List[Tuple[int, dto.CreateUser]] = []
+    number = 0
+    async for line in _iter_lines(body):
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            if format == "ndjson":
+                user = dto.CreateUser.model_validate_json(line)
+            elif header is None:
+                header = next(csv.reader([line.decode()]))
+                continue
+            else:
+                user = _parse_csv(line, header)
+        except (ValidationError, ValueError):
+            invalid.append(dto.SkippedUser(line=number, reason="invalid"))
+            continue
+
+        batch.append((number, user))
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+class ImportUsersCommand(Command[ImportUsersQuery, dto.ImportedUsers]):
+    """
+    Reads the body as it arrives, so only one batch of users is held in memory.
+    Everything is imported in a single transaction
+    """
+
+    __slots__ = ("_gateway",)
+
+    def __init__(self, gateway: ServiceGateway) -> None:
+        self._gateway = gateway
+
+    async def execute(
+        self, query: ImportUsersQuery, **kwargs: Any
+    ) -> dto.ImportedUsers:
+        invalid: List[dto.SkippedUser] = []
+        batches = _iter_batches(kwargs.pop("body"), query.format, invalid)
+        async with self._gateway:
+            await self._gateway.database.manager.create_transaction()
+
+            result = await self._gateway.user().create_many(batches, **kwargs)
+
+        result.skipped = sorted(result.skipped + invalid, key=lambda user: user.line)
+        return result
@@ -1,25 +1,23 @@
-from typing import Annotated, Final
+from typing import Annotated
 
 from fastapi import Depends
 from fastapi.concurrency import run_in_threadpool
 
 import src.common.dto as dto
-from src.api.common.cache.redis import RedisCache
+from src.api.common.cache.session import RefreshSessionStore
 from src.api.common.providers import Stub
 from src.common.exceptions import NotFoundError, UnAuthorizedError
-from src.common.interfaces.hasher import AbstractHasher
+from src.common.interfaces.hasher import AbstractAsyncHasher
 from src.database.gateway import DBGateway
 from src.services.security.jwt import TokenJWT
 
-DEFAULT_TOKENS_COUNT: Final[int] = 5
-
 
 class Login:
     async def __call__(
         self,
         body: dto.UserLogin,
-        hasher: Annotated[AbstractHasher, Depends(Stub(AbstractHasher))],
-        cache: Annotated[RedisCache, Depends(Stub(RedisCache))],
+        hasher: Annotated[AbstractAsyncHasher, Depends(Stub(AbstractAsyncHasher))],
+        sessions: Annotated[RefreshSessionStore, Depends(Stub(RefreshSessionStore))],
         jwt: Annotated[TokenJWT, Depends(Stub(TokenJWT))],
         database: Annotated[DBGateway, Depends(Stub(DBGateway))],
     ) -> dto.TokensExpire:
@@ -29,18 +27,14 @@ class Login:
         if not user:
             raise NotFoundError("User not found")
 
-        if not hasher.verify_password(user.password, body.password):
+        if not await hasher.verify_password(user.password, body.password):
             raise UnAuthorizedError("Incorrect password")
 
         _, access = await run_in_threadpool(jwt.create, typ="access", sub=str(user.id))
         expire, refresh = await run_in_threadpool(
             jwt.create, typ="refresh", sub=str(user.id)
         )
-        tokens = await cache.get_list(str(user.id))
-        if len(tokens) > DEFAULT_TOKENS_COUNT:
-            await cache.delete(str(user.id))
-
-        await cache.set_list(str(user.id), f"{body.fingerprint}::{refresh.token}")
+        await sessions.add(user.id, body.fingerprint, refresh.token, expire)
 
         return dto.TokensExpire(
             refresh_expire=expire,
@@ -0,0 +1,20 @@
+from typing import Optional
+
+from fastapi import FastAPI
+
+from src.api.common.middlewares.ratelimit import RateLimitMiddleware
+from src.api.common.middlewares.read_your_writes import ReadYourWritesMiddleware
+from src.api.common.ratelimit import RateLimiter
+from src.database.core.routing import DatabaseRouter
+
+
+def setup_middlewares(
+    app: FastAPI,
+    limiter: RateLimiter,
+    router: Optional[DatabaseRouter] = None,
+    read_your_writes_seconds: float = 5.0,
+) -> None:
+    if rule := limiter.rule("default"):
+        app.add_middleware(RateLimitMiddleware, limiter=limiter, rule=rule)
+    if router is not None and read_your_writes_seconds > 0:
+        app.add_middleware(ReadYourWritesMiddleware, window=read_your_writes_seconds)
@@ -1,5 +1,4 @@
-from contextlib import asynccontextmanager
-from typing import Any, AsyncIterator, Optional, Tuple
+from typing import Any, Optional, Tuple
 
 from fastapi import FastAPI
 
@@ -7,17 +6,11 @@ from src.api.common.exceptions import setup_exception_handlers
 from src.api.common.responses import DefaultJSONResponse
 from src.api.v1.dependencies import setup_dependencies
 from src.api.v1.endpoints import setup_routers
+from src.api.v1.middlewares import setup_middlewares
 from src.core.logger import log
 from src.core.settings import Settings
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI) -> AsyncIterator[None]:
-    yield
-    if hasattr(app.state, "engine"):
-        await app.state.engine.dispose()
-
-
 def init_app_v1(
     settings: Settings,
     title: str = "FastAPI",
@@ -32,13 +25,18 @@ def init_app_v1(
         title=title,
         version=version,
         default_response_class=DefaultJSONResponse,
-        lifespan=lifespan,
         docs_url=docs_url,
         redoc_url=redoc_url,
         swagger_ui_oauth2_redirect_url=swagger_ui_oauth2_redirect_url,
         **kw,
     )
     setup_dependencies(app, settings)
+    setup_middlewares(
+        app,
+        app.state.limiter,
+        getattr(app.state, "db_router", None),
+        settings.db.read_your_writes_seconds,
+    )
     setup_routers(app)
     setup_exception_handlers(app)
 
@@ -3,7 +3,15 @@ import importlib
 from src.common.dto.base import DTO
 from src.common.dto.status import Status
 from src.common.dto.token import Token, Tokens, TokensExpire
-from src.common.dto.user import CreateUser, Fingerprint, User, UserLogin
+from src.common.dto.user import (
+    CreateUser,
+    Fingerprint,
+    ImportedUsers,
+    SkippedUser,
+    User,
+    UserLogin,
+    UsersPage,
+)
 
 
 # this is a hack for recursive imports pydantic types
@@ -20,11 +28,14 @@ __all__ = (
     "Token",
     "Tokens",
     "User",
+    "UsersPage",
     "CreateUser",
     "Status",
     "UserLogin",
     "TokensExpire",
     "Fingerprint",
+    "ImportedUsers",
+    "SkippedUser",
 )
 
 # this should be unchanged
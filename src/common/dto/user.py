@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import uuid
+from typing import List, Literal, Optional
 
 from src.common.dto.base import DTO
 
@@ -8,6 +9,12 @@ from src.common.dto.base import DTO
 class User(DTO):
     id: uuid.UUID
     login: str
+    is_admin: bool = False
+
+
+class UsersPage(DTO):
+    items: List[User]
+    next_cursor: Optional[str] = None
 
 
 class CreateUser(DTO):
@@ -22,3 +29,14 @@ class Fingerprint(DTO):
 class UserLogin(Fingerprint):
     login: str
     password: str
+
+
+class SkippedUser(DTO):
+    line: int
+    login: Optional[str] = None
+    reason: Literal["conflict", "invalid"]
+
+
+class ImportedUsers(DTO):
+    imported: int
+    skipped: List[SkippedUser]
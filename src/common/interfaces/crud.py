@@ -1,7 +1,9 @@
 import abc
 from typing import (
     Any,
+    AsyncIterator,
     Generic,
+    Iterable,
     Mapping,
     Optional,
     Sequence,
@@ -28,6 +30,20 @@ class AbstractCRUDRepository(abc.ABC, Generic[EntryType]):
     ) -> Sequence[EntryType]:
         raise NotImplementedError
 
+    async def insert_or_ignore(
+        self, *returning: Any, conflict: Sequence[Any], **values: Any
+    ) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def upsert(
+        self,
+        *returning: Any,
+        conflict: Sequence[Any],
+        update_columns: Optional[Sequence[str]] = None,
+        **values: Any,
+    ) -> Any:
+        raise NotImplementedError
+
     @abc.abstractmethod
     async def select(self, *clauses: Any) -> Optional[EntryType]:
         raise NotImplementedError
@@ -38,6 +54,41 @@ class AbstractCRUDRepository(abc.ABC, Generic[EntryType]):
     ) -> Sequence[EntryType]:
         raise NotImplementedError
 
+    async def select_many_columns(
+        self,
+        columns: Sequence[Any],
+        *clauses: Any,
+        offset: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Sequence[Any]:
+        raise NotImplementedError
+
+    async def fetch_row(self, stmt: Any, **params: Any) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def select_page(
+        self,
+        columns: Sequence[Any],
+        keys: Sequence[Any],
+        *clauses: Any,
+        after: Optional[Sequence[Any]] = None,
+        limit: int,
+    ) -> Sequence[Any]:
+        raise NotImplementedError
+
+    def stream_columns(
+        self, columns: Sequence[Any], *clauses: Any, chunk_size: int
+    ) -> AsyncIterator[Sequence[Any]]:
+        raise NotImplementedError
+
+    async def copy_records(
+        self,
+        records: Iterable[Sequence[Any]],
+        columns: Sequence[str],
+        table: Optional[str] = None,
+    ) -> None:
+        raise NotImplementedError
+
     @abc.abstractmethod
     async def update(
         self, *clauses: Any, **values: Mapping[str, Any]
@@ -48,10 +99,16 @@ class AbstractCRUDRepository(abc.ABC, Generic[EntryType]):
     async def update_many(self, values: Sequence[Mapping[str, Any]]) -> Any:
         raise NotImplementedError
 
+    async def update_count(self, *clauses: Any, **values: Any) -> int:
+        raise NotImplementedError
+
     @abc.abstractmethod
     async def delete(self, *clauses: Any) -> Sequence[EntryType]:
         raise NotImplementedError
 
+    async def delete_count(self, *clauses: Any) -> int:
+        raise NotImplementedError
+
     async def exists(self, *clauses: Any) -> bool:
         raise NotImplementedError
 
@@ -1,9 +1,17 @@
-from typing import Protocol
+from typing import List, Protocol, Sequence
 
 
 class AbstractHasher(Protocol):
     def hash_password(self, plain: str) -> str: ...
 
+    def hash_passwords(self, plains: Sequence[str]) -> List[str]: ...
+
     def verify_password(self, hashed: str, plain: str) -> bool: ...
 
 
+class AbstractAsyncHasher(Protocol):
+    async def hash_password(self, plain: str) -> str: ...
+
+    async def hash_passwords(self, plains: Sequence[str]) -> List[str]: ...
+
+    async def verify_password(self, hashed: str, plain: str) -> bool: ...
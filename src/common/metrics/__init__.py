@@ -0,0 +1,57 @@
+from src.common.metrics.definitions import (
+    DB_POOL_CHECKOUT_SECONDS,
+    DB_POOL_CHECKOUTS_PER_REQUEST,
+    DB_POOL_IN_USE,
+    DB_ROUTED_STATEMENTS,
+    HASHER_IN_FLIGHT,
+    HASHER_QUEUED,
+    HASHER_REJECTED,
+    HASHER_SECONDS,
+    HTTP_REQUEST_SECONDS,
+    HTTP_REQUESTS_IN_FLIGHT,
+    JWT_VERIFY_SECONDS,
+    REDIS_COMMAND_SECONDS,
+    REDIS_POOL_IN_USE,
+    REDIS_POOL_WAIT_SECONDS,
+    TOKEN_CACHE_ENTRIES,
+    TOKEN_CACHE_LOOKUPS,
+)
+from src.common.metrics.registry import (
+    CONTENT_TYPE,
+    REGISTRY,
+    Counter,
+    CounterChild,
+    Gauge,
+    GaugeChild,
+    Histogram,
+    HistogramChild,
+    Registry,
+)
+
+__all__ = (
+    "CONTENT_TYPE",
+    "REGISTRY",
+    "Counter",
+    "CounterChild",
+    "Gauge",
+    "GaugeChild",
+    "Histogram",
+    "HistogramChild",
+    "Registry",
+    "DB_POOL_CHECKOUT_SECONDS",
+    "DB_POOL_CHECKOUTS_PER_REQUEST",
+    "DB_POOL_IN_USE",
+    "DB_ROUTED_STATEMENTS",
+    "HASHER_IN_FLIGHT",
+    "HASHER_QUEUED",
+    "HASHER_REJECTED",
+    "HASHER_SECONDS",
+    "HTTP_REQUEST_SECONDS",
+    "HTTP_REQUESTS_IN_FLIGHT",
+    "JWT_VERIFY_SECONDS",
+    "REDIS_COMMAND_SECONDS",
+    "REDIS_POOL_IN_USE",
+    "REDIS_POOL_WAIT_SECONDS",
+    "TOKEN_CACHE_ENTRIES",
+    "TOKEN_CACHE_LOOKUPS",
+)
@@ -0,0 +1,78 @@
+from typing import Final
+
+from src.common.metrics.registry import Counter, Gauge, Histogram
+
+HTTP_REQUEST_SECONDS: Final[Histogram] = Histogram(
+    "http_request_duration_seconds",
+    "Time spent on http requests, by route template",
+    ("method", "route", "status"),
+)
+HTTP_REQUESTS_IN_FLIGHT: Final[Gauge] = Gauge(
+    "http_requests_in_flight",
+    "Http requests being processed right now",
+)
+DB_POOL_CHECKOUT_SECONDS: Final[Histogram] = Histogram(
+    "db_pool_checkout_seconds",
+    "Time spent waiting for a database connection from the pool",
+)
+DB_POOL_IN_USE: Final[Gauge] = Gauge(
+    "db_pool_connections_in_use",
+    "Database connections checked out of the pool",
+)
+DB_POOL_CHECKOUTS_PER_REQUEST: Final[Histogram] = Histogram(
+    "db_pool_checkouts_per_request",
+    "Database connections taken from the pool by one http request, by route template",
+    ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 10),
+)
+DB_ROUTED_STATEMENTS: Final[Counter] = Counter(
+    "db_routed_statements_total",
+    "Statements by the database they were routed to, "
+    "fallback is a read sent to the primary because no replica was healthy",
+    ("target",),
+)
+REDIS_COMMAND_SECONDS: Final[Histogram] = Histogram(
+    "redis_command_duration_seconds",
+    "Time spent on redis calls, by cache operation",
+    ("command",),
+)
+REDIS_POOL_WAIT_SECONDS: Final[Histogram] = Histogram(
+    "redis_pool_wait_seconds",
+    "Time spent waiting for a redis connection from the pool",
+)
+REDIS_POOL_IN_USE: Final[Gauge] = Gauge(
+    "redis_pool_connections_in_use",
+    "Redis connections checked out of the pool",
+)
+HASHER_IN_FLIGHT: Final[Gauge] = Gauge(
+    "hasher_in_flight",
+    "Password hashing calls queued or running",
+)
+HASHER_QUEUED: Final[Gauge] = Gauge(
+    "hasher_queued",
+    "Password hashing calls waiting for a free worker",
+)
+HASHER_REJECTED: Final[Counter] = Counter(
+    "hasher_rejected_total",
+    "Password hashing calls rejected because the queue was full",
+)
+HASHER_SECONDS: Final[Histogram] = Histogram(
+    "hasher_duration_seconds",
+    "Time spent on password hashing calls, including queueing",
+    ("operation",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+JWT_VERIFY_SECONDS: Final[Histogram] = Histogram(
+    "jwt_verify_duration_seconds",
+    "Time spent on jwt signature and claims verification",
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01),
+)
+TOKEN_CACHE_LOOKUPS: Final[Counter] = Counter(
+    "token_cache_lookups_total",
+    "Lookups of verified access tokens in the per-worker cache, by result",
+    ("result",),
+)
+TOKEN_CACHE_ENTRIES: Final[Gauge] = Gauge(
+    "token_cache_entries",
+    "Verified access tokens held in the per-worker caches",
+)
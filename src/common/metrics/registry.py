@@ -0,0 +1,447 @@
+import math
+import mmap
+import os
+import threading
+from bisect import bisect_left
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Final,
+    Generic,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    TypeVar,
+    cast,
+)
+
+import orjson
+
+MetricKind = Literal["counter", "gauge", "histogram"]
+SeriesKey = Tuple[str, Tuple[str, ...]]
+ChildType = TypeVar("ChildType", bound="_Child")
+
+# enough for a few thousand histogram series per process,
+# file backed storage is sparse, so unused slots cost nothing
+MAX_SLOTS: Final[int] = 1 << 16
+SLOT_SIZE: Final[int] = 8
+# series which didn't fit are written over here instead
+SINK_SLOTS: Final[int] = 64
+DEFAULT_BUCKETS: Final[Tuple[float, ...]] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+CONTENT_TYPE: Final[str] = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Slots(Protocol):
+    """Float64 view of the slots, typeshed only knows memoryviews of ints"""
+
+    def __getitem__(self, index: int, /) -> float: ...
+
+    def __setitem__(self, index: int, value: float, /) -> None: ...
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+    return True
+
+
+class _Storage:
+    """
+    Float64 slots of the current process.
+
+    With `directory` slots live in a mmap'd `<pid>.db` file and every
+    allocation is appended to `<pid>.keys`, so any process can aggregate them.
+    """
+
+    __slots__ = ("_directory", "_pid", "_mmap", "_values", "_used", "_keys", "_lock")
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        self._directory = directory
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._keys = None
+        if directory:
+            path = Path(directory, f"{self._pid}.db")
+            with path.open("w+b") as f:
+                f.truncate(MAX_SLOTS * SLOT_SIZE)
+                self._mmap = mmap.mmap(f.fileno(), MAX_SLOTS * SLOT_SIZE)
+            self._keys = Path(directory, f"{self._pid}.keys").open("wb")
+        else:
+            self._mmap = mmap.mmap(-1, MAX_SLOTS * SLOT_SIZE)
+
+        self._values = memoryview(self._mmap).cast("d")
+        self._used = SINK_SLOTS
+
+    @property
+    def values(self) -> _Slots:
+        return cast(_Slots, self._values)
+
+    def allocate(self, key: SeriesKey, count: int) -> int:
+        with self._lock:
+            if self._used + count > MAX_SLOTS:
+                return 0
+            first = self._used
+            self._used += count
+            if self._keys is not None:
+                line = orjson.dumps([first, count, key[0], key[1]])
+                self._keys.write(line + b"\n")
+                self._keys.flush()
+
+        return first
+
+    def read(self, first: int, count: int) -> List[float]:
+        return cast(List[float], self._values[first : first + count].tolist())
+
+
+class _Child:
+    __slots__ = ("_values", "_first", "_count")
+
+    def __init__(self, count: int) -> None:
+        self._count = count
+        self._values: _Slots
+        self._first = 0
+
+    def _bind(self, storage: _Storage, key: SeriesKey) -> None:
+        self._first = storage.allocate(key, self._count)
+        self._values = storage.values
+
+
+class CounterChild(_Child):
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        super().__init__(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._values[self._first] += amount
+
+
+class GaugeChild(_Child):
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        super().__init__(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._values[self._first] += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._values[self._first] -= amount
+
+    def set(self, value: float) -> None:
+        self._values[self._first] = value
+
+
+class HistogramChild(_Child):
+    """Slots are per bucket counts (not cumulative) followed by the sum"""
+
+    __slots__ = ("_bounds", "_sum")
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        super().__init__(len(bounds) + 1)
+        self._bounds = bounds
+        self._sum = len(bounds)
+
+    def _bind(self, storage: _Storage, key: SeriesKey) -> None:
+        super()._bind(storage, key)
+        self._sum = self._first + len(self._bounds)
+
+    def observe(self, value: float) -> None:
+        values = self._values
+        values[self._first + bisect_left(self._bounds, value)] += 1
+        values[self._sum] += value
+
+
+class Metric(Generic[ChildType]):
+    kind: MetricKind
+
+    __slots__ = ("name", "documentation", "labelnames", "_registry", "_children")
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional["Registry"] = None,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._registry = registry or REGISTRY
+        self._children: Dict[Tuple[str, ...], ChildType] = {}
+        self._registry.register(self)
+
+    def _new_child(self) -> ChildType:
+        raise NotImplementedError
+
+    def labels(self, *values: str) -> ChildType:
+        child = self._children.get(values)
+        if child is None:
+            child = self._create(values)
+
+        return child
+
+    def _create(self, values: Tuple[str, ...]) -> ChildType:
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._new_child()
+        self._registry.bind(child, (self.name, values))
+
+        return self._children.setdefault(values, child)
+
+    def children(self) -> Iterator[Tuple[Tuple[str, ...], ChildType]]:
+        yield from list(self._children.items())
+
+
+class Counter(Metric[CounterChild]):
+    kind = "counter"
+
+    __slots__ = ()
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(Metric[GaugeChild]):
+    """Values of the running processes are summed up"""
+
+    kind = "gauge"
+
+    __slots__ = ()
+
+    def _new_child(self) -> GaugeChild:
+        return GaugeChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class Histogram(Metric[HistogramChild]):
+    kind = "histogram"
+
+    __slots__ = ("buckets",)
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry: Optional["Registry"] = None,
+    ) -> None:
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        if len(self.buckets) >= SINK_SLOTS:
+            raise ValueError(f"{name} can't have more than {SINK_SLOTS - 2} buckets")
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+
+class Registry:
+    """
+    Metrics of every worker process.
+
+    Observations are plain writes into shared memory without locks,
+    concurrent writes from threads may rarely lose an update.
+    With a directory set every process writes its own files, which are
+    summed up on collection, so any worker can serve the whole picture.
+    Gauges only count processes which are still running.
+    """
+
+    __slots__ = ("_metrics", "_storage", "_directory")
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        self._metrics: Dict[str, Metric[Any]] = {}
+        self._directory = directory
+        self._storage = _Storage(directory)
+
+    @property
+    def directory(self) -> Optional[str]:
+        return self._directory
+
+    def register(self, metric: "Metric[Any]") -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def bind(self, child: _Child, key: SeriesKey) -> None:
+        child._bind(self._storage, key)
+
+    def configure(self, directory: Optional[str]) -> None:
+        """
+        Switches to storage in `directory`, which has to happen before
+        workers are forked. Files of processes which are gone are removed.
+        """
+        if directory:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+            for path in Path(directory).glob("*.keys"):
+                if path.stem.isdigit() and not _pid_alive(int(path.stem)):
+                    path.unlink(missing_ok=True)
+                    path.with_suffix(".db").unlink(missing_ok=True)
+
+        self._directory = directory
+        self._rebind()
+
+    def reset_after_fork(self) -> None:
+        self._rebind()
+
+    def _rebind(self) -> None:
+        self._storage = _Storage(self._directory)
+        for metric in self._metrics.values():
+            for labels, child in metric.children():
+                child._bind(self._storage, (metric.name, labels))
+
+    def collect(self) -> Dict[SeriesKey, List[float]]:
+        if not self._directory:
+            return self._collect_local()
+
+        result: Dict[SeriesKey, List[float]] = {}
+        for path in Path(self._directory).glob("*.keys"):
+            if not path.stem.isdigit():
+                continue
+            alive = _pid_alive(int(path.stem))
+            try:
+                lines = path.read_bytes().splitlines()
+                data = path.with_suffix(".db").read_bytes()
+            except FileNotFoundError:
+                continue
+
+            for line in lines:
+                try:
+                    first, count, name, labels = orjson.loads(line)
+                except (orjson.JSONDecodeError, ValueError):
+                    # the line is still being written
+                    continue
+                metric = self._metrics.get(name)
+                if metric is None or (metric.kind == "gauge" and not alive):
+                    continue
+                values = memoryview(data)[
+                    first * SLOT_SIZE : (first + count) * SLOT_SIZE
+                ]
+                self._add(
+                    result,
+                    (name, tuple(labels)),
+                    cast(List[float], values.cast("d").tolist()),
+                )
+
+        return result
+
+    def _collect_local(self) -> Dict[SeriesKey, List[float]]:
+        result: Dict[SeriesKey, List[float]] = {}
+        for metric in self._metrics.values():
+            for labels, child in metric.children():
+                self._add(
+                    result,
+                    (metric.name, labels),
+                    self._storage.read(child._first, child._count),
+                )
+
+        return result
+
+    @staticmethod
+    def _add(
+        result: Dict[SeriesKey, List[float]], key: SeriesKey, values: List[float]
+    ) -> None:
+        current = result.get(key)
+        if current is None:
+            result[key] = values
+        else:
+            for i, value in enumerate(values):
+                current[i] += value
+
+    def render(self) -> bytes:
+        """Prometheus text exposition format"""
+        collected = self.collect()
+        by_metric: Dict[str, List[Tuple[Tuple[str, ...], List[float]]]] = {}
+        for (name, labels), values in collected.items():
+            by_metric.setdefault(name, []).append((labels, values))
+
+        lines: List[str] = []
+        for name, metric in self._metrics.items():
+            lines.append(f"# HELP {name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for labels, values in sorted(by_metric.get(name, ())):
+                pairs = list(zip(metric.labelnames, labels, strict=False))
+                if isinstance(metric, Histogram):
+                    lines.extend(_render_histogram(name, pairs, metric.buckets, values))
+                else:
+                    lines.append(f"{name}{_labels(pairs)} {_number(values[0])}")
+
+        return ("\n".join(lines) + "\n").encode()
+
+
+def _render_histogram(
+    name: str,
+    pairs: List[Tuple[str, str]],
+    buckets: Tuple[float, ...],
+    values: List[float],
+) -> Iterator[str]:
+    total = 0.0
+    for bound, count in zip(buckets, values, strict=False):
+        total += count
+        le = "+Inf" if bound == math.inf else _number(bound)
+        yield f"{name}_bucket{_labels(pairs + [('le', le)])} {_number(total)}"
+    yield f"{name}_sum{_labels(pairs)} {_number(values[-1])}"
+    yield f"{name}_count{_labels(pairs)} {_number(total)}"
+
+
+def _labels(pairs: List[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    escaped = (f'{key}="{_escape_value(value)}"' for key, value in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape_value(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n")
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+REGISTRY: Final[Registry] = Registry()
+
+os.register_at_fork(after_in_child=REGISTRY.reset_after_fork)
@@ -0,0 +1,119 @@
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Final, List, Optional
+
+DEFAULT_INTERVAL_SECONDS: Final[float] = 0.005
+PROFILE_SUFFIX: Final[str] = ".prof"
+
+
+def _mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+
+def collapse_stack(frame: Optional[FrameType]) -> str:
+    """`root;...;leaf` as expected by flamegraph.pl and speedscope"""
+    names: List[str] = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """
+    Wall clock sampler of a single thread, usually the one running the event loop.
+
+    Samples are taken from another thread, so the sampled code isn't
+    slowed down by anything but the GIL switches. One run at a time.
+    """
+
+    __slots__ = ("_lock",)
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def sample(
+        self,
+        thread_id: int,
+        seconds: float,
+        interval: float = DEFAULT_INTERVAL_SECONDS,
+    ) -> Optional[str]:
+        """Blocks for `seconds`, returns None if another run is in progress"""
+        if not self._lock.acquire(blocking=False):
+            return None
+
+        stacks: Counter[str] = Counter()
+        try:
+            deadline = time.perf_counter() + seconds
+            while time.perf_counter() < deadline:
+                frame = sys._current_frames().get(thread_id)
+                if frame is not None:
+                    stacks[collapse_stack(frame)] += 1
+                del frame
+                time.sleep(interval)
+        finally:
+            self._lock.release()
+
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class ProfileStore:
+    """
+    Per-request cProfile results saved as `<id>.prof` files.
+    With a directory shared between workers any of them can serve them.
+    Only the latest `max_profiles` are kept.
+    """
+
+    __slots__ = ("_directory", "_max_profiles")
+
+    def __init__(self, directory: str, max_profiles: int = 100) -> None:
+        self._directory = Path(directory)
+        self._max_profiles = max_profiles
+        self._directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex
+
+    def path(self, profile_id: str) -> Path:
+        return self._directory / f"{uuid.UUID(profile_id).hex}{PROFILE_SUFFIX}"
+
+    def save(self, profile_id: str, profiler: cProfile.Profile) -> None:
+        profiler.dump_stats(self.path(profile_id))
+        self._prune()
+
+    def exists(self, profile_id: str) -> bool:
+        return self.path(profile_id).is_file()
+
+    def render(self, profile_id: str, limit: int = 50) -> str:
+        stream = io.StringIO()
+        stats = pstats.Stats(str(self.path(profile_id)), stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+
+        return stream.getvalue()
+
+    def _prune(self) -> None:
+        profiles = sorted(self._directory.glob(f"*{PROFILE_SUFFIX}"), key=_mtime)
+        for path in profiles[: max(len(profiles) - self._max_profiles, 0)]:
+            path.unlink(missing_ok=True)
@@ -0,0 +1,9 @@
+import csv
+import io
+from typing import Any, Iterable
+
+
+def csv_dumps(rows: Iterable[Iterable[Any]]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
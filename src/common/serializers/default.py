@@ -1,7 +1,9 @@
-from typing import Any, Dict, Optional, Union
+from functools import lru_cache
+from typing import Any, List, Optional, Type
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import SchemaSerializer
 
 
 def _predict_bytes(value: Any) -> Optional[bytes]:
@@ -14,7 +16,32 @@ def _predict_bytes(value: Any) -> Optional[bytes]:
             return None
 
 
-def _default(value: Any) -> Optional[Union[str, Dict[str, Any]]]:
+@lru_cache(maxsize=256)
+def _list_serializer(model: Type[BaseModel]) -> SchemaSerializer:
+    return TypeAdapter(List[model]).serializer  # type: ignore[valid-type]
+
+
+@lru_cache(maxsize=256)
+def _type_serializer(type_: Type[Any]) -> SchemaSerializer:
+    return TypeAdapter(type_).serializer
+
+
+def _predict_serializer(value: Any) -> Optional[SchemaSerializer]:
+    """
+    Models and lists of one model type get a compiled pydantic-core serializer,
+    so they are dumped in one call instead of a `_default` callback per item
+    """
+    if isinstance(value, BaseModel):
+        return value.__pydantic_serializer__
+    if isinstance(value, list) and value:
+        model = type(value[0])
+        if issubclass(model, BaseModel) and all(type(item) is model for item in value):
+            return _list_serializer(model)
+
+    return None
+
+
+def _default(value: Any) -> Any:
     match value:
         case BaseModel():
             return value.model_dump(mode="json", exclude_none=True, by_alias=True)
@@ -23,4 +50,6 @@ def _default(value: Any) -> Optional[Union[str, Dict[str, Any]]]:
         case Exception():
             return value.args[0] if len(value.args) > 0 else "Unknown error"
         case _:
-            return None
+            # Decimal, timedelta, sets, urls, secrets etc. as pydantic's json mode
+            # writes them, unsupported types raise instead of turning into null
+            return _type_serializer(value.__class__).to_python(value, mode="json")
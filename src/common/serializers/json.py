@@ -1,17 +1,28 @@
 import json
-from typing import Any
+from typing import Any, Sequence
 
-from src.common.serializers.default import _default, _predict_bytes
+from src.common.serializers.default import (
+    _default,
+    _predict_bytes,
+    _predict_serializer,
+)
 
 
 def json_dumps(value: Any) -> bytes:
-    return (
-        _predict_bytes(value)
-        or json.dumps(
-            value,
-            default=_default,
-            ensure_ascii=False,
-            separators=(",", ":"),
-            allow_nan=False,
-        ).encode()
-    )
+    if predicted := _predict_bytes(value):
+        return predicted
+    if (serializer := _predict_serializer(value)) is not None:
+        return serializer.to_json(value, exclude_none=True, by_alias=True)
+
+    return json.dumps(
+        value,
+        default=_default,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        allow_nan=False,
+    ).encode()
+
+
+def json_dumps_lines(values: Sequence[Any]) -> bytes:
+    """NDJSON, one value per line"""
+    return b"".join([json_dumps(value) + b"\n" for value in values])
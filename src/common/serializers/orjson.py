@@ -1,8 +1,12 @@
 import warnings
-from typing import Any
+from typing import Any, Sequence
 
-from src.common.serializers.default import _default, _predict_bytes
-from src.common.serializers.json import json_dumps
+from src.common.serializers.default import (
+    _default,
+    _predict_bytes,
+    _predict_serializer,
+)
+from src.common.serializers.json import json_dumps, json_dumps_lines
 
 try:
     import orjson as orjson  # type: ignore # noqa
@@ -17,8 +21,33 @@ def orjson_dumps(value: Any) -> bytes:
             stacklevel=1,
         )
         return json_dumps(value)
-    return _predict_bytes(value) or orjson.dumps(
-        value,
-        default=_default,
-        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+    if predicted := _predict_bytes(value):
+        return predicted
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    if (serializer := _predict_serializer(value)) is not None:
+        # python mode leaves UUID and datetime as is, orjson encodes them natively
+        # and much faster than pydantic-core's json mode does. Anything orjson
+        # can't encode falls back to `_default`, UTC is written as Z like pydantic does
+        value = serializer.to_python(value, exclude_none=True, by_alias=True)
+        option |= orjson.OPT_UTC_Z
+
+    return orjson.dumps(value, default=_default, option=option)
+
+
+def orjson_dumps_lines(values: Sequence[Any]) -> bytes:
+    """NDJSON, one value per line"""
+    if not orjson:
+        warnings.warn(
+            message="orjson is not installed. Consider to install it `pip install orjson`. Using default json serializer",
+            stacklevel=1,
+        )
+        return json_dumps_lines(values)
+    option = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE
     )
+    if (serializer := _predict_serializer(values)) is not None:
+        values = serializer.to_python(values, exclude_none=True, by_alias=True)
+        option |= orjson.OPT_UTC_Z
+
+    dumps = orjson.dumps
+    return b"".join([dumps(value, default=_default, option=option) for value in values])
@@ -0,0 +1,85 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from functools import wraps
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    Optional,
+    ParamSpec,
+    Set,
+    TypeVar,
+)
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+class Timings:
+    """Time spent per phase of the current request, in seconds"""
+
+    __slots__ = ("phases", "_active")
+
+    def __init__(self) -> None:
+        self.phases: Dict[str, float] = {}
+        self._active: Set[str] = set()
+
+
+_timings: ContextVar[Optional[Timings]] = ContextVar("timings", default=None)
+
+
+def start_timings(timings: Timings) -> "Token[Optional[Timings]]":
+    return _timings.set(timings)
+
+
+def reset_timings(token: "Token[Optional[Timings]]") -> None:
+    _timings.reset(token)
+
+
+def current_timings() -> Optional[Timings]:
+    return _timings.get()
+
+
+def record(phase: str, seconds: float) -> None:
+    """For phases measured elsewhere, e.g. by callbacks"""
+    timings = _timings.get()
+    if timings is not None:
+        timings.phases[phase] = timings.phases.get(phase, 0.0) + seconds
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """
+    Adds the time spent inside to `phase` of the current request.
+    Does nothing outside of a timed request, nested calls
+    of the same phase are counted once.
+    """
+    timings = _timings.get()
+    if timings is None or phase in timings._active:
+        yield
+        return
+
+    timings._active.add(phase)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        timings._active.discard(phase)
+        timings.phases[phase] = timings.phases.get(phase, 0.0) + elapsed
+
+
+def timer(
+    phase: str,
+) -> Callable[[Callable[P, Awaitable[R]]], Callable[P, Awaitable[R]]]:
+    def _wrapper(coro: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+        @wraps(coro)
+        async def _inner(*args: P.args, **kwargs: P.kwargs) -> R:
+            with timed(phase):
+                return await coro(*args, **kwargs)
+
+        return _inner
+
+    return _wrapper
@@ -1,8 +1,10 @@
 import os
+import tempfile
 from pathlib import Path
 from typing import (
     Final,
     List,
+    Literal,
     Optional,
     Union,
 )
@@ -53,6 +55,20 @@ class DatabaseSettings(BaseSettings):
     connection_pool_size: int = 10
     connection_max_overflow: int = 90
     connection_pool_pre_ping: bool = True
+    # compiled SQL kept per engine by SQLAlchemy
+    query_cache_size: int = 500
+    # prepared statements kept per asyncpg connection, by SQLAlchemy and asyncpg
+    prepared_statement_cache_size: int = 100
+    statement_cache_size: int = 100
+    # PgBouncer in transaction mode doesn't keep prepared statements
+    # between transactions, so statement caches are off and names are unique
+    pgbouncer: bool = False
+    # full urls, plain reads are spread over them while they keep up
+    replicas: List[str] = []
+    replica_max_lag_seconds: float = 5.0
+    replica_check_interval_seconds: float = 2.0
+    # reads of a client stay on the primary this long after its writes
+    read_your_writes_seconds: float = 5.0
 
     @property
     def url(self) -> str:
@@ -79,6 +95,18 @@ class RedisSettings(BaseSettings):
     host: str = "127.0.0.1"
     port: int = 6379
     password: Optional[str] = None
+    mode: Literal["standalone", "cluster", "sentinel"] = "standalone"
+    # `host:port` of cluster startup nodes or sentinels, host/port are used if empty
+    nodes: List[str] = []
+    sentinel_master: str = "mymaster"
+    sentinel_password: Optional[str] = None
+    max_connections: int = 50
+    # how long to wait for a free connection when the pool is exhausted
+    pool_timeout: Optional[float] = 5.0
+    socket_timeout: Optional[float] = None
+    socket_connect_timeout: Optional[float] = None
+    health_check_interval: int = 0
+    protocol: int = Field(default=2, ge=2, le=3)
 
 
 class ServerSettings(BaseSettings):
@@ -94,6 +122,8 @@ class ServerSettings(BaseSettings):
     origins: List[str] = ["*"]
     host: str = "127.0.0.1"
     port: int = 8080
+    # exposes the time spent per phase in the `Server-Timing` header
+    timing: bool = False
 
 
 class CipherSettings(BaseSettings):
@@ -109,6 +139,97 @@ class CipherSettings(BaseSettings):
     public_key: str = ""
     access_token_expire_seconds: int = 0
     refresh_token_expire_seconds: int = 0
+    key_id: Optional[str] = None
+    # JWKS with extra verification keys, e.g. the previous key while rotating
+    jwks: Optional[str] = None
+    jwks_file: Optional[str] = None
+    # signs pagination cursors, derived from secret_key if empty
+    cursor_secret: Optional[str] = None
+
+
+class HasherSettings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file="./.env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        env_prefix="HASHER_",
+        extra="ignore",
+    )
+    profile: Literal[
+        "RFC_9106_LOW_MEMORY", "RFC_9106_HIGH_MEMORY", "CHEAPEST", "PRE_21_2", "DEFAULT"
+    ] = "DEFAULT"
+    executor: Literal["thread", "process"] = "thread"
+    workers: Optional[int] = None
+    max_pending: Optional[int] = None
+    # share of `max_pending` batches, e.g. user imports, can take
+    max_batch_pending: Optional[int] = None
+
+
+class CacheSettings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file="./.env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        env_prefix="CACHE_",
+        extra="ignore",
+    )
+    token_max_size: int = 10_000
+    token_ttl_seconds: float = 60.0
+    # per-worker memory layer in front of redis
+    local_enabled: bool = False
+    local_max_size: int = 10_000
+    local_max_bytes: int = 64 * 1024 * 1024
+    local_ttl_seconds: float = 5.0
+
+
+class RateLimitSettings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file="./.env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        env_prefix="RATE_LIMIT_",
+        extra="ignore",
+    )
+    enabled: bool = True
+    algorithm: Literal["token_bucket", "sliding_window"] = "token_bucket"
+    # rules look like `5/minute`, `100/10 seconds`, None disables the rule
+    # per client ip for every request
+    default: Optional[str] = None
+    login: Optional[str] = "5/minute"
+    login_ip: Optional[str] = "20/minute"
+    # per-worker fallback used while redis is unavailable
+    fallback_max_size: int = 10_000
+
+
+class MetricsSettings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file="./.env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        env_prefix="METRICS_",
+        extra="ignore",
+    )
+    enabled: bool = True
+    # shared by every worker, required to aggregate metrics under gunicorn
+    directory: Optional[str] = None
+
+
+class ProfilingSettings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file="./.env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        env_prefix="PROFILING_",
+        extra="ignore",
+    )
+    # nothing is mounted or wrapped while disabled
+    enabled: bool = False
+    # sent in `header` to profile a request, the endpoints are for admins
+    token: str = ""
+    header: str = "X-Profile-Token"
+    directory: str = path("profiles", base_path=tempfile.gettempdir())
+    max_profiles: int = 100
+    max_sample_seconds: float = 60.0
 
 
 class Settings(BaseSettings):
@@ -116,6 +237,11 @@ class Settings(BaseSettings):
     redis: RedisSettings
     server: ServerSettings
     ciphers: CipherSettings
+    hasher: HasherSettings
+    cache: CacheSettings
+    rate_limit: RateLimitSettings
+    metrics: MetricsSettings
+    profiling: ProfilingSettings
 
 
 def load_settings(
@@ -123,10 +249,20 @@ def load_settings(
     redis: Optional[RedisSettings] = None,
     server: Optional[ServerSettings] = None,
     ciphers: Optional[CipherSettings] = None,
+    hasher: Optional[HasherSettings] = None,
+    cache: Optional[CacheSettings] = None,
+    rate_limit: Optional[RateLimitSettings] = None,
+    metrics: Optional[MetricsSettings] = None,
+    profiling: Optional[ProfilingSettings] = None,
 ) -> Settings:
     return Settings(
         db=db or DatabaseSettings(),
         redis=redis or RedisSettings(),
         server=server or ServerSettings(),
         ciphers=ciphers or CipherSettings(),
+        hasher=hasher or HasherSettings(),
+        cache=cache or CacheSettings(),
+        rate_limit=rate_limit or RateLimitSettings(),
+        metrics=metrics or MetricsSettings(),
+        profiling=profiling or ProfilingSettings(),
     )
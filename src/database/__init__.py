@@ -9,7 +9,7 @@ def create_database_factory(
     manager: Type[TransactionManager], session_factory: SessionFactoryType
 ) -> Callable[[], DBGateway]:
     def _create() -> DBGateway:
-        return DBGateway(manager(session_factory()))
+        return DBGateway(manager(session_factory))
 
     return _create
 
@@ -1,8 +1,133 @@
-from typing import Type
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    cast,
+    get_args,
+)
+
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import inspect
+from sqlalchemy.orm import InstrumentedAttribute
 
 from src.common.dto.base import DTOType
-from src.database.models.base import ModelType
+from src.database.exceptions import InvalidParamsError
+from src.database.models.base import Base, ModelType
 
 
 def from_model_to_dto(model: ModelType, dto: Type[DTOType]) -> DTOType:
+    return cast(DTOType, _compile_converter(type(model), dto)(model))
+
+
+def from_models_to_dtos(
+    rows: Iterable[Sequence[Any]], dto: Type[DTOType]
+) -> List[DTOType]:
+    """
+    Converts column tuples fetched with `select(*dto_columns(model, dto))`,
+    so no ORM entities and identity map are involved at all.
+    Extra trailing columns, e.g. pagination keys, are ignored
+    """
+    fields = tuple(dto.model_fields)
+    if (construct := _compile_constructor(dto)) is None:
+        adapter = cast(TypeAdapter[List[DTOType]], _list_adapter(dto))
+        return adapter.validate_python(
+            [dict(zip(fields, row, strict=False)) for row in rows]
+        )
+
+    return [construct(dict(zip(fields, row, strict=False))) for row in rows]
+
+
+@lru_cache(maxsize=256)
+def dto_columns(
+    model: Type[Base], dto: Type[BaseModel]
+) -> Tuple[InstrumentedAttribute[Any], ...]:
+    columns = {column.key for column in inspect(model).column_attrs}
+    if missing := set(dto.model_fields).difference(columns):
+        raise InvalidParamsError(
+            f"{model.__name__} has no columns for {dto.__name__} fields: {', '.join(sorted(missing))}"
+        )
+
+    return tuple(getattr(model, name) for name in dto.model_fields)
+
+
+def _validate(model: Base, dto: Type[DTOType]) -> DTOType:
     return dto(**model.as_dict())
+
+
+def _is_nested(annotation: Any) -> bool:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return True
+
+    return any(_is_nested(arg) for arg in get_args(annotation))
+
+
+@lru_cache(maxsize=256)
+def _list_adapter(dto: Type[BaseModel]) -> TypeAdapter[List[Any]]:
+    return TypeAdapter(List[dto])  # type: ignore[valid-type]
+
+
+@lru_cache(maxsize=256)
+def _compile_constructor(
+    dto: Type[DTOType],
+) -> Optional[Callable[[Dict[str, Any]], DTOType]]:
+    """
+    Values we read from our own database already have the right types, so DTOs
+    with only flat fields are built from them the way `model_construct` does,
+    without validation. DTOs with nested models, extras or private attributes
+    return None and have to be validated
+    """
+    if (
+        dto.__private_attributes__
+        or dto.model_config.get("extra") == "allow"
+        or any(_is_nested(field.annotation) for field in dto.model_fields.values())
+    ):
+        return None
+
+    fields_set = set(dto.model_fields)
+    new = object.__new__
+    setattr_ = object.__setattr__
+
+    def construct(values: Dict[str, Any]) -> DTOType:
+        result = new(dto)
+        setattr_(result, "__dict__", values)
+        setattr_(result, "__pydantic_fields_set__", fields_set.copy())
+        setattr_(result, "__pydantic_extra__", None)
+        setattr_(result, "__pydantic_private__", None)
+        return result
+
+    return construct
+
+
+@lru_cache(maxsize=256)
+def _compile_converter(
+    model: Type[Base], dto: Type[DTOType]
+) -> Callable[[Base], DTOType]:
+    """
+    ORM rows are converted without validation when every DTO field is a plain
+    column. Relationships and non-column fields go through `as_dict()`
+    """
+    fields = tuple(dto.model_fields)
+    columns = {column.key for column in inspect(model).column_attrs}
+    construct = cast(
+        Optional[Callable[[Dict[str, Any]], DTOType]], _compile_constructor(dto)
+    )
+    if construct is None or not columns.issuperset(fields):
+        return lambda instance: _validate(instance, dto)
+
+    def convert(instance: Base) -> DTOType:
+        state = instance.__dict__
+        try:
+            values = {name: state[name] for name in fields}
+        except KeyError:  # unloaded column, let validation report it
+            return _validate(instance, dto)
+
+        return construct(values)
+
+    return convert
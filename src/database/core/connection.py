@@ -1,18 +1,146 @@
-from typing import Any
+import time
+import uuid
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Optional
 
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, ExecutionContext
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.pool import (
+    AsyncAdaptedQueuePool,
+    ConnectionPoolEntry,
+    PoolProxiedConnection,
+)
+
+from src.common.metrics import DB_POOL_CHECKOUT_SECONDS, DB_POOL_IN_USE
+from src.common.timing import record
+from src.database.core.routing import DatabaseRouter, RoutingSession
 
 SessionFactoryType = async_sessionmaker[AsyncSession]
 
 
+class PoolCheckouts:
+    """Connections taken from the pool during the current request"""
+
+    __slots__ = ("count",)
+
+    def __init__(self) -> None:
+        self.count = 0
+
+
+_checkouts: ContextVar[Optional[PoolCheckouts]] = ContextVar(
+    "pool_checkouts", default=None
+)
+
+
+def start_checkouts(checkouts: PoolCheckouts) -> "Token[Optional[PoolCheckouts]]":
+    return _checkouts.set(checkouts)
+
+
+def reset_checkouts(token: "Token[Optional[PoolCheckouts]]") -> None:
+    _checkouts.reset(token)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Observes how long it takes to get a connection, including waiting for it"""
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+
+
+def _on_checkout(
+    dbapi_connection: Any,
+    connection_record: ConnectionPoolEntry,
+    connection_proxy: PoolProxiedConnection,
+) -> None:
+    DB_POOL_IN_USE.inc()
+    if (checkouts := _checkouts.get()) is not None:
+        checkouts.count += 1
+
+
+def _on_checkin(dbapi_connection: Any, connection_record: ConnectionPoolEntry) -> None:
+    DB_POOL_IN_USE.dec()
+
+
+def _before_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: ExecutionContext,
+    executemany: bool,
+) -> None:
+    context._query_start = time.perf_counter()  # type: ignore[attr-defined]
+
+
+def _after_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: ExecutionContext,
+    executemany: bool,
+) -> None:
+    record("db", time.perf_counter() - context._query_start)  # type: ignore[attr-defined]
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def asyncpg_connect_args(
+    prepared_statement_cache_size: int = 100,
+    statement_cache_size: int = 100,
+    pgbouncer: bool = False,
+) -> Dict[str, Any]:
+    """
+    With PgBouncer a statement prepared by one transaction may land on another
+    server connection, so nothing is cached and names can't collide
+    """
+    if pgbouncer:
+        return {
+            "prepared_statement_cache_size": 0,
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": _unique_statement_name,
+        }
+
+    return {
+        "prepared_statement_cache_size": prepared_statement_cache_size,
+        "statement_cache_size": statement_cache_size,
+    }
+
+
 def create_sa_engine(url: str, **kwargs: Any) -> AsyncEngine:
-    return create_async_engine(url, **kwargs)
+    kwargs.setdefault("poolclass", TimedQueuePool)
+    engine = create_async_engine(url, **kwargs)
+    event.listen(engine.sync_engine, "checkout", _on_checkout)
+    event.listen(engine.sync_engine, "checkin", _on_checkin)
+    # sync events run in the greenlet of the caller, so they see its context
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_execute)
+
+    return engine
+
 
+def create_sa_session_factory(
+    engine: AsyncEngine, router: Optional[DatabaseRouter] = None
+) -> SessionFactoryType:
+    if router is None:
+        return async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
 
-def create_sa_session_factory(engine: AsyncEngine) -> SessionFactoryType:
-    return async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    return async_sessionmaker(
+        engine,
+        autoflush=False,
+        expire_on_commit=False,
+        sync_session_class=RoutingSession,
+        router=router,
+    )
@@ -10,31 +10,50 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
 )
 
+from src.database.core.routing import PRIMARY
 from src.database.exceptions import CommitError, RollbackError
 
 
 class TransactionManager:
     __slots__ = (
-        "session",
+        "_session",
+        "_session_factory",
         "_transaction",
     )
 
     def __init__(
         self, session_or_factory: Union[AsyncSession, async_sessionmaker[AsyncSession]]
     ) -> None:
+        self._session: Optional[AsyncSession] = None
+        self._session_factory: Optional[async_sessionmaker[AsyncSession]] = None
         if isinstance(session_or_factory, async_sessionmaker):
-            self.session = session_or_factory()
+            self._session_factory = session_or_factory
         else:
-            self.session = session_or_factory
+            self._session = session_or_factory
 
         self._transaction: Optional[AsyncSessionTransaction] = None
 
+    @property
+    def session(self) -> AsyncSession:
+        """
+        Created on first use, so a unit of work that never reaches the database,
+        e.g. served from a cache, costs neither a session nor a connection
+        """
+        if self._session is None:
+            assert self._session_factory is not None
+            self._session = self._session_factory()
+
+        return self._session
+
     async def __aexit__(
         self,
         exc_type: Optional[Type[BaseException]],
         exc_value: Optional[BaseException],
         traceback: Optional[TracebackType],
     ) -> None:
+        if self._session is None:
+            return
+
         if self._transaction:
             if exc_type:
                 await self.rollback()
@@ -59,9 +78,12 @@ class TransactionManager:
             raise RollbackError from err
 
     async def create_transaction(self) -> None:
+        # reads of a transaction see its own writes only on the primary
+        self.session.info[PRIMARY] = True
         if not self.session.in_transaction() and self.session.is_active:
             self._transaction = await self.session.begin()
 
     async def close_transaction(self) -> None:
-        if self.session.is_active:
-            await self.session.close()
+        # gives the connection back to the pool right away
+        if self._session is not None and self._session.is_active:
+            await self._session.close()
@@ -0,0 +1,183 @@
+import asyncio
+import itertools
+import time
+from contextvars import ContextVar, Token
+from typing import Any, Final, List, Optional, Sequence
+
+from sqlalchemy import Select, event, text
+from sqlalchemy.engine import Engine, ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+from src.common.metrics import DB_ROUTED_STATEMENTS, CounterChild
+from src.core.logger import log
+
+# set on `Session.info` for units of work that have to see the primary,
+# e.g. explicit transactions
+PRIMARY: Final[str] = "primary"
+
+_TO_PRIMARY: Final[CounterChild] = DB_ROUTED_STATEMENTS.labels("primary")
+_TO_REPLICA: Final[CounterChild] = DB_ROUTED_STATEMENTS.labels("replica")
+_FALLBACK: Final[CounterChild] = DB_ROUTED_STATEMENTS.labels("fallback")
+# a replica that replayed everything it received is not behind,
+# even if nothing was written on the primary for a while
+_REPLICATION_LAG = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+
+class ReadYourWrites:
+    """Whether reads of the current client should stay on the primary"""
+
+    __slots__ = ("sticky_until", "wrote")
+
+    def __init__(self, sticky_until: float = 0.0) -> None:
+        self.sticky_until = sticky_until
+        self.wrote = False
+
+
+_read_your_writes: ContextVar[Optional[ReadYourWrites]] = ContextVar(
+    "read_your_writes", default=None
+)
+
+
+def start_read_your_writes(state: ReadYourWrites) -> "Token[Optional[ReadYourWrites]]":
+    return _read_your_writes.set(state)
+
+
+def reset_read_your_writes(token: "Token[Optional[ReadYourWrites]]") -> None:
+    _read_your_writes.reset(token)
+
+
+class DatabaseRouter:
+    """
+    Hands out a healthy replica for reads, in turns. Replicas are checked
+    every `check_interval` seconds and ones lagging more than `max_lag` seconds,
+    or failing, are skipped until the next check. Without healthy replicas
+    reads go to the primary
+    """
+
+    __slots__ = (
+        "primary",
+        "replicas",
+        "_healthy",
+        "_turn",
+        "_max_lag",
+        "_check_interval",
+        "_checker",
+    )
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: Sequence[AsyncEngine],
+        *,
+        max_lag: float = 5.0,
+        check_interval: float = 2.0,
+    ) -> None:
+        self.primary = primary
+        self.replicas = tuple(replicas)
+        # nothing is trusted before the first check
+        self._healthy: List[AsyncEngine] = []
+        self._turn = itertools.count()
+        self._max_lag = max_lag
+        self._check_interval = check_interval
+        self._checker: Optional[asyncio.Task[None]] = None
+        for replica in self.replicas:
+            event.listen(replica.sync_engine, "handle_error", self._on_error)
+
+    def reader(self) -> Engine:
+        if not (healthy := self._healthy):
+            _FALLBACK.inc()
+            return self.primary.sync_engine
+
+        _TO_REPLICA.inc()
+        return healthy[next(self._turn) % len(healthy)].sync_engine
+
+    def writer(self) -> Engine:
+        _TO_PRIMARY.inc()
+        return self.primary.sync_engine
+
+    async def start(self) -> None:
+        if self.replicas and self._checker is None:
+            await self.check()
+            self._checker = asyncio.create_task(self._check_forever())
+
+    async def stop(self) -> None:
+        if self._checker is not None:
+            self._checker.cancel()
+            try:
+                await self._checker
+            except asyncio.CancelledError:
+                pass
+            self._checker = None
+
+        self._healthy = []
+        for replica in self.replicas:
+            await replica.dispose()
+
+    async def check(self) -> None:
+        lags = await asyncio.gather(*(self._lag(replica) for replica in self.replicas))
+        self._healthy = [
+            replica
+            for replica, lag in zip(self.replicas, lags, strict=True)
+            if lag is not None and lag <= self._max_lag
+        ]
+
+    async def _lag(self, replica: AsyncEngine) -> Optional[float]:
+        try:
+            async with asyncio.timeout(self._check_interval):
+                async with replica.connect() as connection:
+                    return float(await connection.scalar(_REPLICATION_LAG) or 0)
+        except Exception as e:
+            log.warning(f"Replica {replica.url.host} is unavailable -> {e!r}")
+            return None
+
+    async def _check_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self._check_interval)
+            await self.check()
+
+    def _on_error(self, context: ExceptionContext) -> None:
+        # don't wait for the next check to stop sending reads to a dead replica
+        if context.is_disconnect and context.engine is not None:
+            self._healthy = [
+                replica
+                for replica in self._healthy
+                if replica.sync_engine is not context.engine
+            ]
+
+
+class RoutingSession(Session):
+    """
+    Plain SELECTs go to a replica, anything else goes to the primary, and so does
+    everything after it in the same unit of work. Reads of a client stay on the
+    primary for a while after its writes, see `ReadYourWrites`
+    """
+
+    def __init__(self, *, router: Optional[DatabaseRouter] = None, **kw: Any) -> None:
+        super().__init__(**kw)
+        self._router = router
+
+    def get_bind(self, mapper: Any = None, *, clause: Any = None, **kw: Any) -> Any:
+        if self._router is None:
+            return super().get_bind(mapper, clause=clause, **kw)
+
+        state = _read_your_writes.get()
+        if (
+            self.info.get(PRIMARY)
+            or self._flushing
+            or not isinstance(clause, Select)
+            or clause._for_update_arg is not None
+        ):
+            self.info[PRIMARY] = True
+            if state is not None:
+                state.wrote = True
+            return self._router.writer()
+
+        if state is not None and state.sticky_until > time.time():
+            return self._router.writer()
+
+        return self._router.reader()
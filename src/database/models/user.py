@@ -1,4 +1,4 @@
-from sqlalchemy import func
+from sqlalchemy import false, func
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.schema import Index
 
@@ -9,5 +9,10 @@ from src.database.models.base.mixins import ModelWithTimeMixin, ModelWithUUIDMix
 class User(ModelWithUUIDMixin, ModelWithTimeMixin, Base):
     login: Mapped[str] = mapped_column()
     password: Mapped[str]
+    is_admin: Mapped[bool] = mapped_column(default=False, server_default=false())
 
-    __table_args__ = (Index("idx_lower_login", func.lower(login), unique=True),)
+    __table_args__ = (
+        Index("idx_lower_login", func.lower(login), unique=True),
+        # keyset pagination
+        Index("idx_created_at_id", "created_at", "id"),
+    )
@@ -1,10 +1,17 @@
 from __future__ import annotations
 
+import time
+from functools import lru_cache
 from typing import (
+    TYPE_CHECKING,
     Any,
+    AsyncIterator,
+    Iterable,
     Mapping,
+    NoReturn,
     Optional,
     Sequence,
+    Tuple,
     Type,
     cast,
 )
@@ -12,18 +19,54 @@ from typing import (
 from sqlalchemy import (
     ColumnExpressionArgument,
     CursorResult,
+    Row,
+    Select,
     delete,
     exists,
     func,
     insert,
     select,
+    tuple_,
     update,
 )
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.common.interfaces.crud import AbstractCRUDRepository
+from src.common.timing import record
 from src.database.models.base import ModelType
 
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Connection, Dialect
+    from sqlalchemy.orm import InstrumentedAttribute
+    from sqlalchemy.sql._typing import _ColumnsClauseArgument
+
+
+def _raise_dbapi_error(
+    connection: Connection,
+    adapted: Any,
+    error: Exception,
+    statement: str,
+    parameters: Tuple[Any, ...],
+) -> NoReturn:
+    """
+    Error of a query which went around the engine, as if it went through it:
+    the driver's error becomes a DBAPI one, `handle_error` listeners see it
+    and a connection lost on the way is invalidated
+    """
+    try:
+        adapted._handle_exception(error)
+    except Exception as e:
+        connection._handle_dbapi_exception(e, statement, parameters, None, None)
+    raise error
+
+
+@lru_cache(maxsize=256)
+def _positional_sql(stmt: Select[Any], dialect: Dialect) -> Tuple[str, Tuple[str, ...]]:
+    """SQL of a pre-built `stmt` and names of its parameters in order"""
+    compiled = stmt.compile(dialect=dialect)
+    return compiled.string, tuple(compiled.positiontup or ())
+
 
 class CRUDRepository(AbstractCRUDRepository[ModelType]):
     __slots__ = ("_session",)
@@ -43,6 +86,47 @@ class CRUDRepository(AbstractCRUDRepository[ModelType]):
         result = await self._session.scalars(stmt, data)
         return result.all()
 
+    async def insert_or_ignore(
+        self,
+        *returning: _ColumnsClauseArgument[Any],
+        conflict: Sequence[Any],
+        **values: Any,
+    ) -> Optional[Row[Any]]:
+        """
+        `INSERT ... ON CONFLICT (conflict) DO NOTHING`. Returns the `returning` columns,
+        the primary key by default, or None when the row already exists, so a taken
+        unique key neither raises nor aborts the transaction
+        """
+        stmt = (
+            pg_insert(self.model)
+            .values(**values)
+            .on_conflict_do_nothing(index_elements=conflict)
+            .returning(*(returning or self._primary_key))
+        )
+        return (await self._session.execute(stmt)).first()
+
+    async def upsert(
+        self,
+        *returning: _ColumnsClauseArgument[Any],
+        conflict: Sequence[Any],
+        update_columns: Optional[Sequence[str]] = None,
+        **values: Any,
+    ) -> Row[Any]:
+        """
+        `INSERT ... ON CONFLICT (conflict) DO UPDATE`. On conflict `update_columns`,
+        by default every inserted column, are overwritten with the inserted values.
+        Returns the `returning` columns, the primary key by default
+        """
+        insert_stmt = pg_insert(self.model).values(**values)
+        stmt = insert_stmt.on_conflict_do_update(
+            index_elements=conflict,
+            set_={
+                name: insert_stmt.excluded[name]
+                for name in (values if update_columns is None else update_columns)
+            },
+        ).returning(*(returning or self._primary_key))
+        return (await self._session.execute(stmt)).one()
+
     async def select(
         self,
         *clauses: ColumnExpressionArgument[bool],
@@ -59,6 +143,96 @@ class CRUDRepository(AbstractCRUDRepository[ModelType]):
         stmt = select(self.model).where(*clauses).offset(offset).limit(limit)
         return (await self._session.execute(stmt)).scalars().all()
 
+    async def select_many_columns(
+        self,
+        columns: Sequence[_ColumnsClauseArgument[Any]],
+        *clauses: ColumnExpressionArgument[bool],
+        offset: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Sequence[Row[Any]]:
+        stmt = select(*columns).where(*clauses).offset(offset).limit(limit)
+        return (await self._session.execute(stmt)).all()
+
+    async def fetch_row(self, stmt: Select[Any], **params: Any) -> Optional[Any]:
+        """
+        Runs a pre-built `stmt` straight on the asyncpg connection of the session, so
+        there is no result processing and no ORM, and returns a `Record`. Inside of
+        a started transaction the query joins it, otherwise it runs on its own,
+        which under read committed is the same, minus BEGIN and COMMIT.
+        Errors are raised the same way the session raises them.
+        Other drivers go through the session and return a `Row`
+        """
+        connection = await self._session.connection(bind_arguments={"clause": stmt})
+        if connection.dialect.driver != "asyncpg":
+            return (await self._session.execute(stmt, params)).first()
+
+        sql, names = _positional_sql(stmt, connection.dialect)
+        args = tuple(params[name] for name in names)
+        raw = await connection.get_raw_connection()
+        start = time.perf_counter()
+        try:
+            return await raw.driver_connection.fetchrow(sql, *args)  # type: ignore[union-attr]
+        except Exception as e:
+            await connection.run_sync(
+                _raise_dbapi_error, raw.dbapi_connection, e, sql, args
+            )
+        finally:
+            # engine events never see this query, so its time is recorded here
+            record("db", time.perf_counter() - start)
+
+    async def select_page(
+        self,
+        columns: Sequence[_ColumnsClauseArgument[Any]],
+        keys: Sequence[InstrumentedAttribute[Any]],
+        *clauses: ColumnExpressionArgument[bool],
+        after: Optional[Sequence[Any]] = None,
+        limit: int,
+    ) -> Sequence[Row[Any]]:
+        """
+        Keyset pagination ordered by `keys`, which should be covered by an index.
+        Values of `keys` are appended to the end of every row, so the last row
+        gives `after` for the next page
+        """
+        stmt = select(*columns, *keys).where(*clauses)
+        if after is not None:
+            stmt = stmt.where(tuple_(*keys) > tuple_(*after))
+        stmt = stmt.order_by(*keys).limit(limit)
+        return (await self._session.execute(stmt)).all()
+
+    async def stream_columns(
+        self,
+        columns: Sequence[_ColumnsClauseArgument[Any]],
+        *clauses: ColumnExpressionArgument[bool],
+        chunk_size: int,
+    ) -> AsyncIterator[Sequence[Row[Any]]]:
+        """
+        Reads through a server-side cursor, `chunk_size` rows at a time. The next
+        chunk is only fetched when the consumer asks for it
+        """
+        stmt = select(*columns).where(*clauses).execution_options(yield_per=chunk_size)
+        result = await self._session.stream(stmt)
+        try:
+            async for partition in result.partitions():
+                yield partition
+        finally:
+            await result.close()
+
+    async def copy_records(
+        self,
+        records: Iterable[Sequence[Any]],
+        columns: Sequence[str],
+        table: Optional[str] = None,
+    ) -> None:
+        """
+        Loads records with the COPY protocol on the session's connection, inside of
+        its transaction. Only available with asyncpg
+        """
+        connection = await self._session.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(  # type: ignore[union-attr]
+            table or self.model.__tablename__, records=records, columns=columns
+        )
+
     async def update(
         self, *clauses: ColumnExpressionArgument[bool], **values: Any
     ) -> Sequence[ModelType]:
@@ -68,12 +242,36 @@ class CRUDRepository(AbstractCRUDRepository[ModelType]):
     async def update_many(self, data: Sequence[Mapping[str, Any]]) -> CursorResult[Any]:
         return await self._session.execute(update(self.model), data)
 
+    async def update_count(
+        self, *clauses: ColumnExpressionArgument[bool], **values: Any
+    ) -> int:
+        """Same as `update`, but returns the number of updated rows only"""
+        stmt = (
+            update(self.model)
+            .where(*clauses)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        return (await self._session.execute(stmt)).rowcount
+
     async def delete(
         self, *clauses: ColumnExpressionArgument[bool]
     ) -> Sequence[ModelType]:
         stmt = delete(self.model).where(*clauses).returning(self.model)
         return (await self._session.execute(stmt)).scalars().all()
 
+    async def delete_count(self, *clauses: ColumnExpressionArgument[bool]) -> int:
+        """Same as `delete`, but returns the number of deleted rows only"""
+        stmt = (
+            delete(self.model)
+            .where(*clauses)
+            .execution_options(synchronize_session=False)
+        )
+        return (await self._session.execute(stmt)).rowcount
+
+    # these take whatever clauses the caller builds, so there is no statement to
+    # build once like the lookups of `UserRepository`, the compiled SQL is still
+    # reused from the engine's cache for clauses of the same shape
     async def exists(self, *clauses: ColumnExpressionArgument[bool]) -> bool:
         stmt = exists(select(self.model).where(*clauses)).select()
         return cast(bool, await self._session.scalar(stmt))
@@ -82,5 +280,9 @@ class CRUDRepository(AbstractCRUDRepository[ModelType]):
         stmt = select(func.count()).where(*clauses).select_from(self.model)
         return cast(int, await self._session.scalar(stmt))
 
+    @property
+    def _primary_key(self) -> Sequence[Any]:
+        return self.model.__mapper__.primary_key
+
     def with_query_model(self, model: Type[ModelType]) -> CRUDRepository[ModelType]:
         return CRUDRepository(self._session, model)
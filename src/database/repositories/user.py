@@ -1,6 +1,22 @@
 import uuid
-from typing import Optional, Type, overload
+from datetime import datetime
+from functools import lru_cache
+from typing import (
+    Any,
+    AsyncIterator,
+    Final,
+    Iterable,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    cast,
+    overload,
+)
 
+from sqlalchemy import Row, Select, bindparam, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql.dml import ReturningInsert
 from typing_extensions import Unpack
 
 import src.database.models as models
@@ -8,6 +24,52 @@ from src.database.exceptions import InvalidParamsError
 from src.database.repositories.base import BaseRepository
 from src.database.repositories.types.user import CreateUserType
 
+# built once, SQLAlchemy memoizes their cache keys, so executing them
+# only looks up the compiled SQL and binds the parameters
+_GET_BY_ID = select(models.User).where(models.User.id == bindparam("user_id"))
+_GET_BY_LOGIN = select(models.User).where(
+    func.lower(models.User.login)
+    == func.lower(bindparam("login", type_=models.User.login.type))
+)
+
+_IMPORT_TABLE: Final[str] = "user_import"
+_CREATE_IMPORT_TABLE = text(
+    f"CREATE TEMPORARY TABLE {_IMPORT_TABLE} "
+    "(line integer NOT NULL, id uuid NOT NULL, login text NOT NULL, password text NOT NULL) "
+    "ON COMMIT DROP"
+)
+# the file order decides which of the duplicated logins wins
+_MERGE_IMPORT = text(
+    f"""
+    WITH inserted AS (
+        INSERT INTO "user" (id, login, password)
+        SELECT id, login, password FROM {_IMPORT_TABLE} ORDER BY line
+        ON CONFLICT (lower(login)) DO NOTHING
+        RETURNING id
+    )
+    SELECT staged.line, staged.login FROM {_IMPORT_TABLE} AS staged
+    LEFT JOIN inserted ON inserted.id = staged.id
+    WHERE inserted.id IS NULL
+    ORDER BY staged.line
+    """
+)
+
+
+@lru_cache(maxsize=16)
+def _get_columns(columns: Tuple[str, ...], by_id: bool) -> Select[Any]:
+    return (_GET_BY_ID if by_id else _GET_BY_LOGIN).with_only_columns(
+        *(getattr(models.User, name) for name in columns)
+    )
+
+
+@lru_cache(maxsize=16)
+def _insert_or_ignore(returning: Tuple[str, ...]) -> ReturningInsert[Any]:
+    return (
+        insert(models.User)
+        .on_conflict_do_nothing(index_elements=(func.lower(models.User.login),))
+        .returning(*(getattr(models.User, name) for name in returning))
+    )
+
 
 class UserRepository(BaseRepository[models.User]):
     __slots__ = ()
@@ -16,8 +78,14 @@ class UserRepository(BaseRepository[models.User]):
     def model(self) -> Type[models.User]:
         return models.User
 
-    async def create(self, **data: Unpack[CreateUserType]) -> Optional[models.User]:
-        return await self._crud.insert(**data)
+    async def create(
+        self, *columns: Any, **data: Unpack[CreateUserType]
+    ) -> Optional[Row[Any]]:
+        """Returns `columns` of the new user, or None if the login is taken"""
+        stmt = _insert_or_ignore(tuple(column.key for column in columns) or ("id",))
+        return cast(
+            Optional[Row[Any]], (await self._session.execute(stmt, dict(data))).first()
+        )
 
     @overload
     async def get_one(self, *, user_id: uuid.UUID) -> Optional[models.User]: ...
@@ -29,6 +97,73 @@ class UserRepository(BaseRepository[models.User]):
         if not any([user_id, login]):
             raise InvalidParamsError("at least one identifier must be provided")
 
-        clause = self.model.id == user_id if user_id else self.model.login == login
+        # logins are unique case-insensitively, matching `idx_lower_login`
+        result = await (
+            self._session.execute(_GET_BY_ID, {"user_id": user_id})
+            if user_id
+            else self._session.execute(_GET_BY_LOGIN, {"login": login})
+        )
+
+        return result.scalars().first()
+
+    @overload
+    async def get_one_row(
+        self, *columns: Any, user_id: uuid.UUID
+    ) -> Optional[Sequence[Any]]: ...
+    @overload
+    async def get_one_row(
+        self, *columns: Any, login: str
+    ) -> Optional[Sequence[Any]]: ...
+    async def get_one_row(
+        self,
+        *columns: Any,
+        user_id: Optional[uuid.UUID] = None,
+        login: Optional[str] = None,
+    ) -> Optional[Sequence[Any]]:
+        """
+        Same lookup as `get_one`, but only `columns` are fetched, by the driver
+        itself, see `CRUDRepository.fetch_row`
+        """
+        if not any([user_id, login]):
+            raise InvalidParamsError("at least one identifier must be provided")
+
+        stmt = _get_columns(tuple(column.key for column in columns), bool(user_id))
+        return await (
+            self._crud.fetch_row(stmt, user_id=user_id)
+            if user_id
+            else self._crud.fetch_row(stmt, login=login)
+        )
+
+    async def get_page(
+        self,
+        *columns: Any,
+        after: Optional[Tuple[datetime, uuid.UUID]] = None,
+        limit: int,
+    ) -> Sequence[Row[Any]]:
+        return await self._crud.select_page(
+            columns,
+            (self.model.created_at, self.model.id),
+            after=after,
+            limit=limit,
+        )
+
+    def stream(
+        self, *columns: Any, chunk_size: int
+    ) -> AsyncIterator[Sequence[Row[Any]]]:
+        return self._crud.stream_columns(columns, chunk_size=chunk_size)
+
+    async def create_import_table(self) -> None:
+        """Staging table for `copy_import`, dropped when the transaction ends"""
+        await self._session.execute(_CREATE_IMPORT_TABLE)
+
+    async def copy_import(
+        self, records: Iterable[Tuple[int, uuid.UUID, str, str]]
+    ) -> None:
+        """Records are `(line, id, login, password)`"""
+        await self._crud.copy_records(
+            records, ("line", "id", "login", "password"), table=_IMPORT_TABLE
+        )
 
-        return await self._crud.select(clause)
+    async def merge_import(self) -> Sequence[Row[Tuple[int, str]]]:
+        """Inserts the staged users and returns `(line, login)` of skipped ones"""
+        return (await self._session.execute(_MERGE_IMPORT)).all()  # type: ignore[return-value]
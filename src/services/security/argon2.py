@@ -1,5 +1,21 @@
-from dataclasses import asdict
-from typing import Any, Dict, Literal
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Final,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
 
 from argon2 import Parameters, PasswordHasher
 from argon2.exceptions import VerificationError, VerifyMismatchError
@@ -10,11 +26,23 @@ from argon2.profiles import (
     RFC_9106_LOW_MEMORY,
 )
 
-from src.common.interfaces.hasher import AbstractHasher
+from src.common.exceptions import TooManyRequestsError
+from src.common.interfaces.hasher import AbstractAsyncHasher, AbstractHasher
+from src.common.metrics import (
+    HASHER_IN_FLIGHT,
+    HASHER_QUEUED,
+    HASHER_REJECTED,
+    HASHER_SECONDS,
+    HistogramChild,
+)
+from src.common.timing import timed, timer
+
+R = TypeVar("R")
 
 ProfileType = Literal[
     "RFC_9106_LOW_MEMORY", "RFC_9106_HIGH_MEMORY", "CHEAPEST", "PRE_21_2", "DEFAULT"
 ]
+ExecutorType = Literal["thread", "process"]
 PROFILES: Dict[str, Parameters] = {
     "RFC_9106_LOW_MEMORY": RFC_9106_LOW_MEMORY,
     "RFC_9106_HIGH_MEMORY": RFC_9106_HIGH_MEMORY,
@@ -32,6 +60,9 @@ class Argon2(AbstractHasher):
     def hash_password(self, plain: str) -> str:
         return self._hasher.hash(plain)
 
+    def hash_passwords(self, plains: Sequence[str]) -> List[str]:
+        return [self._hasher.hash(plain) for plain in plains]
+
     def verify_password(self, hashed: str, plain: str) -> bool:
         try:
             return self._hasher.verify(hashed, plain)
@@ -39,6 +70,189 @@ class Argon2(AbstractHasher):
             return False
 
 
+@dataclass(frozen=True, slots=True)
+class HasherStats:
+    workers: int
+    max_pending: int
+    max_batch_pending: int
+    in_flight: int
+    queued: int
+    completed: int
+    rejected: int
+    avg_wait_seconds: float
+    avg_run_seconds: float
+    max_wait_seconds: float
+
+
+_HASH_SECONDS: Final[HistogramChild] = HASHER_SECONDS.labels("hash")
+_VERIFY_SECONDS: Final[HistogramChild] = HASHER_SECONDS.labels("verify")
+_HASH_MANY_SECONDS: Final[HistogramChild] = HASHER_SECONDS.labels("hash_many")
+
+
+def _timed(func: Callable[..., R], *args: Any) -> Tuple[R, float]:
+    # executed inside of the pool, so the run time is measured where it happens
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+class AsyncArgon2(AbstractAsyncHasher):
+    """
+    Runs argon2 off the event loop in a dedicated size-limited pool.
+
+    At most `max_pending` calls can be queued or running at once,
+    anything above that is rejected with `TooManyRequestsError`
+    instead of piling up in the executor queue.
+    Batches can take at most `max_batch_pending` of those slots,
+    so the rest is always left for single calls, e.g. logins.
+    """
+
+    __slots__ = (
+        "_hasher",
+        "_executor",
+        "_workers",
+        "_max_pending",
+        "_max_batch_pending",
+        "_in_flight",
+        "_batch_in_flight",
+        "_completed",
+        "_rejected",
+        "_wait_total",
+        "_wait_max",
+        "_run_total",
+    )
+
+    def __init__(
+        self,
+        hasher: Argon2,
+        executor: Executor,
+        workers: int,
+        max_pending: int,
+        max_batch_pending: int,
+    ) -> None:
+        self._hasher = hasher
+        self._executor = executor
+        self._workers = workers
+        self._max_pending = max_pending
+        self._max_batch_pending = max_batch_pending
+        self._in_flight = 0
+        self._batch_in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+
+    async def hash_password(self, plain: str) -> str:
+        return await self._submit(_HASH_SECONDS, self._hasher.hash_password, plain)
+
+    async def verify_password(self, hashed: str, plain: str) -> bool:
+        return await self._submit(
+            _VERIFY_SECONDS, self._hasher.verify_password, hashed, plain
+        )
+
+    async def hash_passwords(self, plains: Sequence[str]) -> List[str]:
+        """
+        Splits the batch into one slice per worker, so the pool gets a single task
+        per slice instead of one per password, and each slice takes one slot.
+        Slots of every slice are taken up front, so a batch which doesn't fit
+        is rejected before anything of it is hashed
+        """
+        if not plains:
+            return []
+        slices = min(self._workers, self._max_batch_pending, len(plains))
+        size = -(-len(plains) // slices)
+        chunks = [plains[i : i + size] for i in range(0, len(plains), size)]
+        self._admit(len(chunks), batch=True)
+        try:
+            with timed("hashing"):
+                results = await asyncio.gather(
+                    *(
+                        self._run(
+                            _HASH_MANY_SECONDS, self._hasher.hash_passwords, chunk
+                        )
+                        for chunk in chunks
+                    )
+                )
+        finally:
+            self._release(len(chunks), batch=True)
+
+        return [hashed for result in results for hashed in result]
+
+    def stats(self) -> HasherStats:
+        completed = self._completed or 1
+        return HasherStats(
+            workers=self._workers,
+            max_pending=self._max_pending,
+            max_batch_pending=self._max_batch_pending,
+            in_flight=self._in_flight,
+            queued=max(self._in_flight - self._workers, 0),
+            completed=self._completed,
+            rejected=self._rejected,
+            avg_wait_seconds=self._wait_total / completed,
+            avg_run_seconds=self._run_total / completed,
+            max_wait_seconds=self._wait_max,
+        )
+
+    def _track_in_flight(self, delta: int) -> None:
+        self._in_flight += delta
+        HASHER_IN_FLIGHT.set(self._in_flight)
+        HASHER_QUEUED.set(max(self._in_flight - self._workers, 0))
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _admit(self, slots: int = 1, batch: bool = False) -> None:
+        if self._in_flight + slots > self._max_pending or (
+            batch and self._batch_in_flight + slots > self._max_batch_pending
+        ):
+            self._rejected += 1
+            HASHER_REJECTED.inc()
+            raise TooManyRequestsError(
+                "Too many requests, try again later", headers={"Retry-After": "1"}
+            )
+
+        self._track_in_flight(slots)
+        if batch:
+            self._batch_in_flight += slots
+
+    def _release(self, slots: int = 1, batch: bool = False) -> None:
+        self._track_in_flight(-slots)
+        if batch:
+            self._batch_in_flight -= slots
+
+    @timer("hashing")
+    async def _submit(
+        self, histogram: HistogramChild, func: Callable[..., R], *args: Any
+    ) -> R:
+        self._admit()
+        try:
+            return await self._run(histogram, func, *args)
+        finally:
+            self._release()
+
+    async def _run(
+        self, histogram: HistogramChild, func: Callable[..., R], *args: Any
+    ) -> R:
+        """Runs a call which already took its slot in `_admit`"""
+        start = time.perf_counter()
+        # spelled out, older mypy can't solve R through run_in_executor's *args
+        call: "partial[Tuple[R, float]]" = partial(_timed, func, *args)
+        result, run = await asyncio.get_running_loop().run_in_executor(
+            self._executor, call
+        )
+
+        total = time.perf_counter() - start
+        histogram.observe(total)
+        wait = max(total - run, 0.0)
+        self._completed += 1
+        self._run_total += run
+        self._wait_total += wait
+        self._wait_max = max(self._wait_max, wait)
+
+        return result
+
+
 def get_argon2_hasher(profile: ProfileType = "DEFAULT", **kwargs: Any) -> Argon2:
     if profile == "DEFAULT":  # only need if something gonna change in argon2 module
         kw = {}
@@ -47,3 +261,31 @@ def get_argon2_hasher(profile: ProfileType = "DEFAULT", **kwargs: Any) -> Argon2
         kw.pop("version", None)
 
     return Argon2(PasswordHasher(**(kw | kwargs)))
+
+
+def get_async_argon2_hasher(
+    hasher: Argon2,
+    executor: ExecutorType = "thread",
+    workers: Optional[int] = None,
+    max_pending: Optional[int] = None,
+    max_batch_pending: Optional[int] = None,
+) -> AsyncArgon2:
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 4
+    # half of the slots by default, logins keep the other half
+    max_batch_pending = min(max_batch_pending or max(max_pending // 2, 1), max_pending)
+    # argon2-cffi releases the GIL, so threads are enough in most cases.
+    # Process pool gives full isolation of the hashing memory from the worker
+    pool: Executor = (
+        ThreadPoolExecutor(workers, thread_name_prefix="argon2")
+        if executor == "thread"
+        else ProcessPoolExecutor(workers)
+    )
+
+    return AsyncArgon2(
+        hasher,
+        pool,
+        workers=workers,
+        max_pending=max_pending,
+        max_batch_pending=max_batch_pending,
+    )
@@ -1,5 +1,7 @@
 import base64
+import time
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
 from typing import (
     Any,
     Dict,
@@ -10,19 +12,69 @@ from typing import (
 )
 
 import jwt
+import orjson
 
 from src.common.dto.token import Token
 from src.common.exceptions import ServiceNotImplementedError, UnAuthorizedError
+from src.common.metrics import JWT_VERIFY_SECONDS
 from src.core.settings import CipherSettings
 
 TokenType = Literal["access", "refresh"]
+KeyType = Tuple[Any, str]
+
+
+def _load_key_set(settings: CipherSettings) -> Dict[str, KeyType]:
+    raw: Optional[str] = settings.jwks
+    if settings.jwks_file:
+        raw = Path(settings.jwks_file).read_text(encoding="utf-8")
+    if not raw:
+        return {}
+
+    keys: Dict[str, KeyType] = {}
+    for data in orjson.loads(raw).get("keys", []):
+        kid = data.get("kid")
+        if not kid:
+            continue
+        algorithm = data.get("alg", settings.algorithm)
+        keys[kid] = (jwt.PyJWK.from_dict(data, algorithm).key, algorithm)
+
+    return keys
 
 
 class TokenJWT:
-    __slots__ = ("_settings",)
+    """
+    Keys are parsed once here, so PyJWT receives ready key objects
+    instead of re-reading the PEM on every call.
+
+    Additional verification keys may be provided as a JWKS by `kid`,
+    which allows old and new keys to overlap during rotation.
+    """
+
+    __slots__ = (
+        "_settings",
+        "_jwt",
+        "_jws",
+        "_kid",
+        "_private_key",
+        "_default_key",
+        "_public_keys",
+    )
 
     def __init__(self, settings: CipherSettings) -> None:
         self._settings = settings
+        self._jwt = jwt.PyJWT(options={"require": ["exp", "iat", "sub"]})
+        self._jws = jwt.PyJWS()
+
+        algorithm = self._jws.get_algorithm_by_name(settings.algorithm)
+        self._kid = settings.key_id
+        self._private_key = algorithm.prepare_key(base64.b64decode(settings.secret_key))
+        self._default_key: KeyType = (
+            algorithm.prepare_key(base64.b64decode(settings.public_key)),
+            settings.algorithm,
+        )
+        self._public_keys = _load_key_set(settings)
+        if self._kid:
+            self._public_keys[self._kid] = self._default_key
 
     def create(
         self,
@@ -52,10 +104,11 @@ class TokenJWT:
             "type": typ,
         }
         try:
-            token = jwt.encode(
+            token = self._jwt.encode(
                 to_encode | kw,
-                base64.b64decode(self._settings.secret_key),
+                self._private_key,
                 self._settings.algorithm,
+                headers={"kid": self._kid} if self._kid else None,
             )
         except jwt.PyJWTError as e:
             raise UnAuthorizedError("Token is expired") from e
@@ -63,13 +116,28 @@ class TokenJWT:
         return expire, Token(token=token)
 
     def verify_token(self, token: str) -> Dict[str, Any]:
+        start = time.perf_counter()
         try:
-            result = jwt.decode(
-                token,
-                base64.b64decode(self._settings.public_key),
-                [self._settings.algorithm],
-            )
+            key, algorithm = self._resolve_key(token)
+            result = self._jwt.decode(token, key, [algorithm])
         except jwt.PyJWTError as e:
             raise UnAuthorizedError("Token is invalid or expired") from e
+        finally:
+            JWT_VERIFY_SECONDS.observe(time.perf_counter() - start)
 
         return cast(Dict[str, Any], result)
+
+    def _resolve_key(self, token: str) -> KeyType:
+        # no need to parse the header while there is nothing to choose from
+        if not self._public_keys:
+            return self._default_key
+
+        kid = self._jws.get_unverified_header(token).get("kid")
+        if kid is None:
+            return self._default_key
+
+        key = self._public_keys.get(kid)
+        if key is None:
+            raise jwt.InvalidKeyError(f"Unknown key id: {kid}")
+
+        return key
@@ -1,10 +1,11 @@
 import uuid
-from typing import Any, overload
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Optional, Sequence, Tuple, overload
 
 import src.common.dto as dto
 from src.common.exceptions import ConflictError, NotFoundError
-from src.common.interfaces.hasher import AbstractHasher
-from src.database.converter import from_model_to_dto
+from src.common.interfaces.hasher import AbstractAsyncHasher
+from src.database.converter import dto_columns, from_models_to_dtos
 from src.database.repositories import UserRepository
 from src.database.tools import on_integrity
 
@@ -16,23 +17,83 @@ class UserService:
         self._repository = repository
 
     @on_integrity("login")
-    async def create(self, data: dto.CreateUser, hasher: AbstractHasher) -> dto.User:
-        data.password = hasher.hash_password(data.password)
-        result = await self._repository.create(**data.model_dump())
+    async def create(
+        self, data: dto.CreateUser, hasher: AbstractAsyncHasher
+    ) -> dto.User:
+        data.password = await hasher.hash_password(data.password)
+        result = await self._repository.create(
+            *dto_columns(self._repository.model, dto.User), **data.model_dump()
+        )
 
         if not result:
-            raise ConflictError("This user already exists")
+            raise ConflictError("login already in use")
 
-        return from_model_to_dto(result, dto.User)
+        return from_models_to_dtos((result,), dto.User)[0]
 
     @overload
     async def get_one(self, *, user_id: uuid.UUID) -> dto.User: ...
     @overload
     async def get_one(self, *, login: str) -> dto.User: ...
     async def get_one(self, **kw: Any) -> dto.User:
-        result = await self._repository.get_one(**kw)
+        row = await self._repository.get_one_row(
+            *dto_columns(self._repository.model, dto.User), **kw
+        )
 
-        if not result:
+        if row is None:
             raise NotFoundError("User not found")
 
-        return from_model_to_dto(result, dto.User)
+        return from_models_to_dtos((row,), dto.User)[0]
+
+    async def get_page(
+        self, *, after: Optional[Tuple[datetime, uuid.UUID]] = None, limit: int
+    ) -> Tuple[List[dto.User], Optional[Tuple[datetime, uuid.UUID]]]:
+        """
+        Returns the users after the `after` keyset, and the keyset of the last one
+        if there is a next page
+        """
+        rows = await self._repository.get_page(
+            *dto_columns(self._repository.model, dto.User),
+            after=after,
+            limit=limit + 1,
+        )
+        if len(rows) <= limit:
+            return from_models_to_dtos(rows, dto.User), None
+
+        rows = rows[:limit]
+        created_at, user_id = rows[-1][-2:]
+        return from_models_to_dtos(rows, dto.User), (created_at, user_id)
+
+    async def export(self, *, chunk_size: int = 1000) -> AsyncIterator[List[dto.User]]:
+        async for rows in self._repository.stream(
+            *dto_columns(self._repository.model, dto.User), chunk_size=chunk_size
+        ):
+            yield from_models_to_dtos(rows, dto.User)
+
+    async def create_many(
+        self,
+        batches: AsyncIterator[Sequence[Tuple[int, dto.CreateUser]]],
+        hasher: AbstractAsyncHasher,
+    ) -> dto.ImportedUsers:
+        """
+        Batches are `(line, user)` pairs. Each batch is hashed in parallel and
+        copied into a staging table, then everything is merged at once skipping
+        taken logins. Should be called inside of a transaction
+        """
+        await self._repository.create_import_table()
+        staged = 0
+        async for batch in batches:
+            hashed = await hasher.hash_passwords([user.password for _, user in batch])
+            await self._repository.copy_import(
+                (line, uuid.uuid4(), user.login, password)
+                for (line, user), password in zip(batch, hashed, strict=True)
+            )
+            staged += len(batch)
+
+        skipped = await self._repository.merge_import()
+        return dto.ImportedUsers(
+            imported=staged - len(skipped),
+            skipped=[
+                dto.SkippedUser(line=line, login=login, reason="conflict")
+                for line, login in skipped
+            ],
+        )
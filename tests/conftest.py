@@ -0,0 +1,12 @@
+from pathlib import Path
+
+import pytest
+
+# the settings module refuses to import without a .env, as the app does
+if not Path(__file__).resolve().parent.parent.joinpath(".env").exists():
+    pytest.exit("Tests need a .env in the project root, `cp env.example .env`")
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
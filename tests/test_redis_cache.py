@@ -0,0 +1,315 @@
+import asyncio
+import uuid
+from decimal import Decimal
+from typing import Any, AsyncIterator, Awaitable, Callable, List
+
+import pytest
+from fakeredis import FakeAsyncRedis, FakeServer
+
+from src.api.common.cache.decorators import _background, cached, invalidate_tags
+from src.api.common.cache.redis import (
+    ONE_MINUTE,
+    NonSerializableObjectsProvidedError,
+    RedisCache,
+)
+from src.api.common.cache.tiered import TieredCache
+from src.api.v1.handlers.commands.user import GetUserCommand, GetUserQuery
+from src.common.dto import User
+from src.common.dto.base import DTO
+
+pytestmark = pytest.mark.anyio
+
+
+class Price(DTO):
+    amount: Decimal
+
+
+@pytest.fixture
+def server() -> FakeServer:
+    return FakeServer()
+
+
+@pytest.fixture
+def client(server: FakeServer) -> FakeAsyncRedis:
+    return FakeAsyncRedis(server=server)
+
+
+@pytest.fixture
+def cache(client: FakeAsyncRedis) -> RedisCache:
+    return RedisCache(client)
+
+
+@pytest.fixture
+async def round_trips(
+    client: FakeAsyncRedis, monkeypatch: pytest.MonkeyPatch
+) -> List[bytes]:
+    """Commands written to the connection, every write is one round trip"""
+    sent: List[bytes] = []
+    connection_class = client.connection_pool.connection_class
+    send = connection_class.send_packed_command
+
+    async def _send(self: Any, command: Any, check_health: bool = True) -> None:
+        sent.append(command)
+        await send(self, command, check_health)
+
+    # connecting sends its own commands, they are not counted
+    await client.ping()
+    monkeypatch.setattr(connection_class, "send_packed_command", _send)
+    return sent
+
+
+@pytest.fixture
+async def tiered(server: FakeServer) -> AsyncIterator[TieredCache]:
+    cache = TieredCache(FakeAsyncRedis(server=server))
+    await cache.start()
+    await _wait_for(lambda: cache.invalidation.connected)
+    yield cache
+    await cache.stop()
+
+
+async def _wait_for(condition: Callable[[], bool]) -> None:
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition was never met")
+
+
+async def test_dto_round_trip(cache: RedisCache) -> None:
+    user = User(id=uuid.uuid4(), login="alice")
+
+    await cache.set_many({"user": user})
+
+    assert User.model_validate_json(await cache.get_single("user") or b"") == user
+
+
+async def test_dto_fields_orjson_can_not_encode_are_kept(cache: RedisCache) -> None:
+    await cache.set_many({"price": Price(amount=Decimal("9.99"))})
+
+    assert await cache.get_single("price") == b'{"amount":"9.99"}'
+
+
+async def test_unencodable_value(cache: RedisCache) -> None:
+    with pytest.raises(NonSerializableObjectsProvidedError):
+        await cache.set_many({"key": {"value": object()}})
+
+
+async def test_get_with_ttl(cache: RedisCache) -> None:
+    await cache.set_single("key", "value", expire_seconds=60)
+    await cache.set_single("forever", "value", expire_seconds=None)
+
+    value, ttl = await cache.get_with_ttl("key")
+    assert value == b"value"
+    assert 0 < ttl <= 60_000
+    assert await cache.get_with_ttl("forever") == (b"value", -1)
+    assert await cache.get_with_ttl("missing") == (None, -2)
+
+
+@pytest.mark.parametrize("expire_seconds", [None, 60])
+async def test_many_round_trip(cache: RedisCache, expire_seconds: int) -> None:
+    await cache.set_many({"a": {"n": 1}, "b": [1, 2]}, expire_seconds=expire_seconds)
+
+    assert await cache.get_many("a", "missing", "b") == [b'{"n":1}', None, b"[1,2]"]
+    assert await cache.get_many() == []
+
+
+async def test_delete(cache: RedisCache) -> None:
+    await cache.set_many({"a": 1, "b": 2})
+
+    await cache.delete("a", "b")
+
+    assert await cache.get_many("a", "b") == [None, None]
+
+
+async def test_list_round_trip(cache: RedisCache) -> None:
+    assert await cache.set_list("list", "a", "b", side="right", expire_seconds=60) == 2
+    assert await cache.get_list("list") == ["a", "b"]
+    assert await cache.pop("list", "a") == 1
+    assert await cache.get_list("list") == ["b"]
+
+
+async def test_tags_invalidation(cache: RedisCache) -> None:
+    await cache.set_with_tags("user:1", "one", ["tag:user"])
+    await cache.set_with_tags("user:2", "two", ["tag:user"])
+
+    assert await cache.get_members("tag:user") == {"user:1", "user:2"}
+    assert await invalidate_tags(cache, "user") == 2
+    assert await cache.get_many("user:1", "user:2", "tag:user") == [None, None, None]
+
+
+async def test_pipeline_sends_queued_commands(cache: RedisCache) -> None:
+    async with cache.pipeline() as pipe:
+        pipe.set("a", 1)
+        pipe.set("b", 2)
+
+    assert await cache.get_many("a", "b") == [b"1", b"2"]
+
+
+async def _pipeline(cache: RedisCache) -> None:
+    async with cache.pipeline() as pipe:
+        pipe.set("a", 1)
+        pipe.sadd("tag", "a")
+        pipe.expire("tag", 60)
+
+
+@pytest.mark.parametrize(
+    "call",
+    [
+        pytest.param(lambda cache: cache.get_many("a", "b", "c"), id="get_many"),
+        pytest.param(lambda cache: cache.set_many({"a": 1, "b": 2}), id="set_many-ttl"),
+        pytest.param(
+            lambda cache: cache.set_many({"a": 1, "b": 2}, expire_seconds=None),
+            id="set_many",
+        ),
+        pytest.param(
+            lambda cache: cache.set_with_tags("a", "one", ["tag:1", "tag:2"]),
+            id="set_with_tags",
+        ),
+        pytest.param(
+            lambda cache: cache.set_list("list", "a", "b", expire_seconds=60),
+            id="set_list",
+        ),
+        pytest.param(
+            lambda cache: cache.get_members("tag:1", "tag:2"), id="get_members"
+        ),
+        pytest.param(lambda cache: cache.get_with_ttl("a"), id="get_with_ttl"),
+        pytest.param(_pipeline, id="pipeline"),
+    ],
+)
+async def test_one_round_trip(
+    cache: RedisCache,
+    round_trips: List[bytes],
+    call: Callable[[RedisCache], Awaitable[Any]],
+) -> None:
+    await call(cache)
+
+    assert len(round_trips) == 1
+
+
+async def test_tiered_serves_local_copy(tiered: TieredCache) -> None:
+    await tiered.set_single("key", "value")
+    assert await tiered.get_single("key") == b"value"
+
+    # written around the tiered cache, so only redis has the new value
+    await RedisCache(tiered._redis).set_single("key", "changed")
+
+    assert await tiered.get_single("key") == b"value"
+    assert tiered.stats().hits == 1
+
+
+async def test_tiered_invalidates_other_workers(
+    server: FakeServer, tiered: TieredCache
+) -> None:
+    other = TieredCache(FakeAsyncRedis(server=server))
+    await other.start()
+    try:
+        await _wait_for(lambda: other.invalidation.connected)
+        await tiered.set_single("key", "value")
+        assert await other.get_single("key") == b"value"
+
+        await tiered.set_single("key", "changed")
+        await _wait_for(lambda: "key" not in other._local)
+
+        assert await other.get_single("key") == b"changed"
+    finally:
+        await other.stop()
+
+
+class _Users:
+    __slots__ = ("_cache", "calls")
+
+    def __init__(self, cache: RedisCache) -> None:
+        self._cache = cache
+        self.calls = 0
+
+    @cached(key="user:{user_id}", dto=User, tags=("user:{user_id}",))
+    async def get(self, user_id: uuid.UUID) -> User:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return User(id=user_id, login="alice")
+
+    @cached(key="stale:{user_id}", dto=User, stale_ttl=ONE_MINUTE)
+    async def get_stale(self, user_id: uuid.UUID) -> User:
+        self.calls += 1
+        return User(id=user_id, login=f"alice-{self.calls}")
+
+
+class _Gateway:
+    """Stands in for `ServiceGateway`, a lookup outside of its block fails"""
+
+    __slots__ = ("is_open",)
+
+    def __init__(self) -> None:
+        self.is_open = False
+
+    async def __aenter__(self) -> "_Gateway":
+        self.is_open = True
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self.is_open = False
+
+    def user(self) -> "_Gateway":
+        return self
+
+    async def get_one(self, *, user_id: uuid.UUID) -> User:
+        await asyncio.sleep(0.01)
+        assert self.is_open
+        return User(id=user_id, login="alice")
+
+
+async def test_cached_loads_once(cache: RedisCache) -> None:
+    users = _Users(cache)
+    user_id = uuid.uuid4()
+
+    results = await asyncio.gather(*(users.get(user_id) for _ in range(5)))
+    assert await users.get(user_id=user_id) == results[0]
+    assert users.calls == 1
+
+    await invalidate_tags(cache, f"user:{user_id}")
+    await users.get(user_id)
+    assert users.calls == 2
+
+
+async def test_cached_serves_stale_while_refreshing(
+    client: FakeAsyncRedis, cache: RedisCache
+) -> None:
+    users = _Users(cache)
+    user_id = uuid.uuid4()
+    first = await users.get_stale(user_id)
+    # past `ttl`, only the stale window is left
+    await client.pexpire(f"stale:{user_id}", 30_000)
+
+    assert await users.get_stale(user_id) == first
+    assert users.calls == 1
+    await asyncio.gather(*_background)
+
+    assert users.calls == 2
+    assert (await users.get_stale(user_id)).login == "alice-2"
+    _, remaining = await cache.get_with_ttl(f"stale:{user_id}")
+    assert remaining > ONE_MINUTE * 1000
+
+
+async def test_get_user_loads_with_its_own_gateway(
+    client: FakeAsyncRedis, cache: RedisCache
+) -> None:
+    gateways: List[_Gateway] = []
+
+    def gateway_factory() -> Any:
+        gateways.append(_Gateway())
+        return gateways[-1]
+
+    command = GetUserCommand(gateway_factory, cache)
+    query = GetUserQuery(user_id=uuid.uuid4())
+
+    # concurrent misses share the load, it doesn't borrow a caller's session
+    await asyncio.gather(command(query), command(query))
+    assert len(gateways) == 1
+
+    await client.pexpire(f"user:{query.user_id}", 30_000)
+    await command(query)
+    await asyncio.gather(*_background)
+
+    # the refresh outlives the call which started it, so it opens its own
+    assert len(gateways) == 2
+    assert not any(gateway.is_open for gateway in gateways)
@@ -0,0 +1,238 @@
+import asyncio
+import os
+import shutil
+import socket
+import subprocess
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Callable, Iterator, List
+
+import pytest
+import redis
+import redis.asyncio as aioredis
+from redis.crc import key_slot
+
+from src.api.common.cache.decorators import invalidate_tags
+from src.api.common.cache.redis import (
+    ClusterClient,
+    RedisCache,
+    RedisClient,
+    create_redis_client,
+)
+from src.api.common.cache.session import RefreshSessionStore, _keys
+from src.api.common.cache.tiered import TieredCache, get_tiered_redis
+from src.core.settings import CacheSettings, RedisSettings
+
+NODES = 3
+SLOTS = 16384
+
+pytestmark = pytest.mark.anyio
+
+
+def _free_port() -> int:
+    # the cluster bus listens on `port + 10000`, it has to be free too
+    while True:
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = int(sock.getsockname()[1])
+        if port + 10_000 > 65_535:
+            continue
+        with socket.socket() as sock:
+            try:
+                sock.bind(("127.0.0.1", port + 10_000))
+            except OSError:
+                continue
+        return port
+
+
+def _wait(condition: Callable[[], bool], timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if condition():
+                return
+        except redis.ConnectionError:
+            pass
+        time.sleep(0.05)
+    raise AssertionError("cluster did not come up")
+
+
+def _form_cluster(ports: List[int]) -> None:
+    """Splits the slots evenly between the nodes, without redis-cli"""
+    clients = [redis.Redis(port=port) for port in ports]
+    try:
+        _wait(lambda: all(client.ping() for client in clients))
+        for i, client in enumerate(clients):
+            first, last = i * SLOTS // len(ports), (i + 1) * SLOTS // len(ports)
+            client.execute_command("CLUSTER ADDSLOTS", *range(first, last))
+        for port in ports[1:]:
+            clients[0].execute_command("CLUSTER MEET", "127.0.0.1", port)
+        _wait(
+            lambda: all(
+                client.execute_command("CLUSTER INFO")["cluster_state"] == "ok"
+                for client in clients
+            )
+        )
+    finally:
+        for client in clients:
+            client.close()
+
+
+@pytest.fixture(scope="module")
+def cluster_nodes(tmp_path_factory: pytest.TempPathFactory) -> Iterator[List[str]]:
+    """`host:port` of a running cluster, TEST_REDIS_CLUSTER or started here"""
+    if nodes := os.getenv("TEST_REDIS_CLUSTER"):
+        yield nodes.split(",")
+        return
+    if (server := shutil.which("redis-server")) is None:
+        pytest.skip("redis-server is not installed and TEST_REDIS_CLUSTER is not set")
+
+    directory = tmp_path_factory.mktemp("cluster")
+    ports: List[int] = []
+    while len(ports) < NODES:
+        if (port := _free_port()) not in ports:
+            ports.append(port)
+    processes = [
+        subprocess.Popen(
+            [
+                server,
+                "--port",
+                str(port),
+                "--bind",
+                "127.0.0.1",
+                "--cluster-enabled",
+                "yes",
+                "--cluster-config-file",
+                f"nodes-{port}.conf",
+                "--dir",
+                str(directory),
+                "--save",
+                "",
+                "--appendonly",
+                "no",
+            ],
+            stdout=subprocess.DEVNULL,
+        )
+        for port in ports
+    ]
+    try:
+        _form_cluster(ports)
+        yield [f"127.0.0.1:{port}" for port in ports]
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+
+async def _close(client: Any) -> None:
+    # stubs don't know `aclose` yet, `close` is its deprecated alias
+    await client.aclose()
+
+
+@pytest.fixture
+def settings(cluster_nodes: List[str]) -> RedisSettings:
+    return RedisSettings(mode="cluster", nodes=cluster_nodes)
+
+
+@pytest.fixture
+async def client(settings: RedisSettings) -> AsyncIterator[RedisClient]:
+    client = create_redis_client(settings)
+    yield client
+    await _close(client)
+
+
+@pytest.fixture
+def cache(client: RedisClient) -> RedisCache:
+    return RedisCache(client)
+
+
+def _keys_in_different_slots(prefix: str) -> List[str]:
+    keys = [f"{prefix}:{n}" for n in range(3)]
+    assert len({key_slot(key.encode()) for key in keys}) > 1
+    return keys
+
+
+async def test_cluster_client(client: RedisClient, cache: RedisCache) -> None:
+    assert isinstance(client, ClusterClient)
+    assert cache._cluster is client
+
+
+@pytest.mark.parametrize("expire_seconds", [None, 60])
+async def test_many_across_slots(cache: RedisCache, expire_seconds: int) -> None:
+    keys = _keys_in_different_slots(uuid.uuid4().hex)
+
+    await cache.set_many(
+        {key: n for n, key in enumerate(keys)}, expire_seconds=expire_seconds
+    )
+
+    assert await cache.get_many(*keys) == [b"0", b"1", b"2"]
+
+
+async def test_tags_across_slots(cache: RedisCache) -> None:
+    prefix = uuid.uuid4().hex
+    key, tags = f"{prefix}:key", [f"{prefix}:{n}" for n in range(2)]
+    tag_keys = [f"tag:{tag}" for tag in tags]
+    assert len({key_slot(name.encode()) for name in (key, *tag_keys)}) > 1
+
+    await cache.set_with_tags(key, "value", tag_keys)
+
+    assert await cache.get_members(*tag_keys) == {key}
+    assert await invalidate_tags(cache, *tags) == 1
+    assert await cache.get_many(key, *tag_keys) == [None, None, None]
+
+
+async def test_session_scripts(cache: RedisCache) -> None:
+    store = RefreshSessionStore(cache)
+    user_id = uuid.uuid4()
+    expire = datetime.now() + timedelta(hours=1)
+    assert len({key_slot(key.encode()) for key in _keys(user_id)}) == 1
+
+    await store.add(user_id, "phone", "first", expire)
+    assert await store.rotate(user_id, "phone", "first", "second", expire)
+    assert await store.revoke(user_id, "second")
+    # a reused token revokes every session of the user
+    await store.add(user_id, "phone", "third", expire)
+    assert not await store.rotate(user_id, "phone", "first", "fourth", expire)
+    assert await cache.get_many(*_keys(user_id)) == [None, None]
+
+
+async def test_tiered_needs_pubsub_client(client: RedisClient) -> None:
+    with pytest.raises(TypeError):
+        TieredCache(client)
+
+
+async def test_tiered_invalidates_across_nodes(
+    settings: RedisSettings, cluster_nodes: List[str]
+) -> None:
+    # subscribed to the first node, published to the last one
+    tiered = get_tiered_redis(settings, CacheSettings())
+    host, _, port = cluster_nodes[-1].rpartition(":")
+    other = TieredCache(
+        create_redis_client(settings),
+        pubsub=aioredis.Redis(host=host, port=int(port)),
+    )
+    key = uuid.uuid4().hex
+    await tiered.start()
+    await other.start()
+    try:
+        for _ in range(100):
+            if tiered.invalidation.connected and other.invalidation.connected:
+                break
+            await asyncio.sleep(0.01)
+        await tiered.set_single(key, "value")
+        assert await tiered.get_single(key) == b"value"
+
+        await other.set_single(key, "changed")
+        for _ in range(100):
+            if key not in tiered._local:
+                break
+            await asyncio.sleep(0.01)
+
+        assert await tiered.get_single(key) == b"changed"
+    finally:
+        for cache in (tiered, other):
+            await cache.stop()
+            await _close(cache._redis)
+            await _close(cache.invalidation._pubsub)
@@ -0,0 +1,74 @@
+import asyncio
+import uuid
+from typing import AsyncIterator, Callable, List, Tuple
+
+import pytest
+from fakeredis import FakeAsyncRedis, FakeServer
+
+from src.api.common.cache.tiered import InvalidationChannel
+from src.api.common.cache.token import TokenCache
+from src.common.dto import User
+
+pytestmark = pytest.mark.anyio
+
+Worker = Tuple[TokenCache, InvalidationChannel]
+
+
+async def _wait_for(condition: Callable[[], bool]) -> None:
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition was never met")
+
+
+@pytest.fixture
+async def workers() -> AsyncIterator[List[Worker]]:
+    server = FakeServer()
+    channels = [InvalidationChannel(FakeAsyncRedis(server=server)) for _ in range(2)]
+    for channel in channels:
+        await channel.start()
+    await _wait_for(lambda: all(channel.connected for channel in channels))
+    yield [(TokenCache(invalidation=channel), channel) for channel in channels]
+    for channel in channels:
+        await channel.stop()
+
+
+def _user(is_admin: bool = False) -> User:
+    return User(id=uuid.uuid4(), login="alice", is_admin=is_admin)
+
+
+async def test_invalidate_user_in_every_worker(workers: List[Worker]) -> None:
+    (first, _), (second, _) = workers
+    user, other = _user(is_admin=True), _user()
+    for cache in (first, second):
+        cache.set("token", {}, user)
+        cache.set("other", {}, other)
+
+    await first.invalidate_user(user.id)
+    assert first.get("token") is None
+    await _wait_for(lambda: second.get("token") is None)
+
+    assert second.get("other") is not None
+
+
+async def test_nothing_is_served_while_disconnected(workers: List[Worker]) -> None:
+    (cache, channel), _ = workers
+    cache.set("token", {}, _user())
+
+    await channel.stop()
+
+    assert cache.get("token") is None
+
+
+async def test_user_loaded_before_invalidation_is_not_stored(
+    workers: List[Worker],
+) -> None:
+    (cache, _), _ = workers
+    user = _user()
+    generation = cache.generation
+
+    await cache.invalidate_user(user.id)
+    cache.set("token", {}, user, generation)
+
+    assert cache.get("token") is None